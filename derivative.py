@@ -1,31 +1,467 @@
 """
 Find derivative in some exact point.
+
+Finite differences of any order and accuracy,
+automatic step by Richardson extrapolation,
+gradient, Jacobian and Hessian of vector functions,
+and forward-mode automatic differentiation
+by dual numbers.
 """
 
-from typing import Callable, Union
-from math import cos
+from typing import Callable, Union, Optional, Tuple
+from functools import lru_cache
+from math import cos, factorial
 import unittest
 
+import numpy as np
+
+Array = Union[int, float, np.ndarray]
+
+LEVELS = 8
+RATIO = 2.0
+
+
+def offsets(scheme: str, accuracy: int, order: int = 1) -> Tuple[int, ...]:
+    """
+    Points of finite difference stencil in units of step.
+
+    >> offsets("forward", 1)   # (0, 1)
+    >> offsets("central", 2)   # (-1, 0, 1)
+
+    :param scheme: "forward", "backward" or "central"
+    :param accuracy: order of error, even for "central"
+    :param order: order of derivative
+    :return: tuple of offsets
+    """
+
+    if scheme == "central":
+        if accuracy % 2:
+            raise ValueError(f"Accuracy(={accuracy}) of central scheme must be even!")
+        half = (order - 1) // 2 + accuracy // 2
+        return tuple(range(-half, half + 1))
+    if scheme == "forward":
+        return tuple(range(order + accuracy))
+    if scheme == "backward":
+        return tuple(range(1 - order - accuracy, 1))
+    raise ValueError(f"Unknown scheme {scheme}!")
+
+
+@lru_cache(maxsize=64)
+def stencil(points: Tuple[int, ...], order: int = 1) -> np.ndarray:
+    """
+    Weights c_k of finite difference, so that
+    f^(order)(x) ~ sum(c_k * f(x + k * h)) / h ** order.
+    Weights solve Vandermonde system of Taylor series.
+
+    :param points: offsets k
+    :param order: order of derivative
+    :return: read-only array of weights
+    """
+
+    k = np.array(points, dtype=float)
+    right = np.zeros(len(k))
+    right[order] = factorial(order)
+    weights = np.linalg.solve(k[None, :] ** np.arange(len(k))[:, None], right)
+    weights[np.abs(weights) < 1e-12] = 0
+    weights.flags.writeable = False
+    return weights
+
+
+def _evaluate(function: Callable, points: np.ndarray) -> np.ndarray:
+    """
+    Call function once on all points, functions
+    of scalars are called point by point.
+    Points are the last axis of the result.
+    """
+
+    try:
+        values = np.asarray(function(points), dtype=float)
+    except (TypeError, ValueError):
+        values = None
+    if values is None or values.shape[-1:] != points.shape[-1:]:
+        values = np.stack(
+            [np.asarray(function(p), dtype=float) for p in np.moveaxis(points, -1, 0)],
+            axis=-1,
+        )
+    return values
+
+
+def richardson(
+    estimates: np.ndarray, power: int, increment: int, ratio: float = RATIO
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Richardson extrapolation of estimates, computed
+    with steps h, h / ratio, h / ratio ** 2, ...
+    (last axis), whose error is
+    C1 * h ** power + C2 * h ** (power + increment) + ...
+
+    Every new column of the table removes one more
+    term, the value with the least difference from
+    its neighbours in the table is returned.
+
+    :return: (value, error estimate)
+    """
+
+    previous = [estimates[..., 0]]
+    value, error = estimates[..., 0], np.full(estimates.shape[:-1], np.inf)
+    for i in range(1, estimates.shape[-1]):
+        row = [estimates[..., i]]
+        for j in range(1, i + 1):
+            factor = ratio ** (power + (j - 1) * increment)
+            row.append(row[j - 1] + (row[j - 1] - previous[j - 1]) / (factor - 1))
+            local = np.maximum(
+                np.abs(row[j] - row[j - 1]), np.abs(row[j] - previous[j - 1])
+            )
+            better = local < error
+            value = np.where(better, row[j], value)
+            error = np.where(better, local, error)
+        previous = row
+    return value, error
+
+
+def _steps(x: np.ndarray, epsilon: Optional[float]) -> np.ndarray:
+    """
+    Steps for every coordinate (last axis - levels):
+    one given epsilon or LEVELS steps for Richardson.
+    """
+
+    if epsilon is not None:
+        return np.full(x.shape + (1,), float(epsilon))
+    return 0.1 * np.maximum(1, np.abs(x))[..., None] / RATIO ** np.arange(LEVELS)
+
+
+def _extrapolate(estimates: np.ndarray, scheme: str, accuracy: int) -> np.ndarray:
+    if estimates.shape[-1] == 1:
+        return estimates[..., 0]
+    return richardson(estimates, accuracy, 2 if scheme == "central" else 1)[0]
+
+
+class Dual:
+    """
+    Dual number a + b * e, where e ** 2 = 0, so
+    f(a + b * e) = f(a) + f'(a) * b * e and
+    arithmetic carries exact derivatives.
+
+    Value may be an array, derivatives have one
+    more (last) axis - directions, so derivatives
+    along many directions are found at once.
+
+    >> x = Dual(1.0, [1.0])
+    >> (np.sin(x) * x).derivatives  # [cos(1) + sin(1)]
+
+    Use numpy functions (np.exp, np.cos, ...),
+    math module doesn't know dual numbers.
+    """
+
+    __array_priority__ = 1000
+
+    def __init__(self, value: Array, derivatives: Array) -> None:
+        self.value = np.asarray(value, dtype=float)
+        self.derivatives = np.asarray(derivatives, dtype=float)
+
+    @staticmethod
+    def lift(other: Union["Dual", Array], directions: int) -> "Dual":
+        """
+        Constant as dual number with zero derivatives.
+        """
+
+        if isinstance(other, Dual):
+            return other
+        value = np.asarray(other, dtype=float)
+        return Dual(value, np.zeros(value.shape + (directions,)))
+
+    def _chain(self, value: Array, slope: Array) -> "Dual":
+        return Dual(value, np.asarray(slope)[..., None] * self.derivatives)
+
+    def __add__(self, other: Union["Dual", Array]) -> "Dual":
+        other = Dual.lift(other, self.derivatives.shape[-1])
+        return Dual(self.value + other.value, self.derivatives + other.derivatives)
+
+    __radd__ = __add__
+
+    def __neg__(self) -> "Dual":
+        return Dual(-self.value, -self.derivatives)
+
+    def __pos__(self) -> "Dual":
+        return self
+
+    def __sub__(self, other: Union["Dual", Array]) -> "Dual":
+        return self + -Dual.lift(other, self.derivatives.shape[-1])
+
+    def __rsub__(self, other: Array) -> "Dual":
+        return -self + other
+
+    def __mul__(self, other: Union["Dual", Array]) -> "Dual":
+        other = Dual.lift(other, self.derivatives.shape[-1])
+        return Dual(
+            self.value * other.value,
+            self.value[..., None] * other.derivatives
+            + other.value[..., None] * self.derivatives,
+        )
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Union["Dual", Array]) -> "Dual":
+        other = Dual.lift(other, self.derivatives.shape[-1])
+        return self * other._chain(1 / other.value, -1 / other.value**2)
+
+    def __rtruediv__(self, other: Array) -> "Dual":
+        return self._chain(1 / self.value, -1 / self.value**2) * other
+
+    def __pow__(self, other: Union["Dual", Array]) -> "Dual":
+        if isinstance(other, Dual):
+            return np.exp(other * np.log(self))
+        other = np.asarray(other, dtype=float)
+        return self._chain(self.value**other, other * self.value ** (other - 1))
+
+    def __rpow__(self, other: Array) -> "Dual":
+        value = np.asarray(other, dtype=float) ** self.value
+        return self._chain(value, value * np.log(other))
+
+    def __abs__(self) -> "Dual":
+        return self._chain(np.abs(self.value), np.sign(self.value))
+
+    def __lt__(self, other: Union["Dual", Array]) -> np.ndarray:
+        return self.value < getattr(other, "value", other)
+
+    def __le__(self, other: Union["Dual", Array]) -> np.ndarray:
+        return self.value <= getattr(other, "value", other)
+
+    def __gt__(self, other: Union["Dual", Array]) -> np.ndarray:
+        return self.value > getattr(other, "value", other)
+
+    def __ge__(self, other: Union["Dual", Array]) -> np.ndarray:
+        return self.value >= getattr(other, "value", other)
+
+    def __getitem__(self, index) -> "Dual":
+        return Dual(self.value[index], self.derivatives[index])
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __repr__(self) -> str:
+        return f"Dual({self.value}, {self.derivatives})"
+
+    def sum(self, axis: Optional[int] = None, **kwargs) -> "Dual":
+        axes = tuple(range(self.value.ndim)) if axis is None else axis
+        return Dual(self.value.sum(axis=axis), self.derivatives.sum(axis=axes))
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        if ufunc in BINARY:
+            return BINARY[ufunc](*inputs)
+        if ufunc in UNARY:
+            (x,) = inputs
+            return x._chain(ufunc(x.value), UNARY[ufunc](x.value))
+        return NotImplemented
+
 
-def derivative(epsilon: float):
+# Derivatives of numpy functions for dual numbers.
+UNARY = {
+    np.exp: np.exp,
+    np.log: lambda x: 1 / x,
+    np.sqrt: lambda x: 0.5 / np.sqrt(x),
+    np.sin: np.cos,
+    np.cos: lambda x: -np.sin(x),
+    np.tan: lambda x: 1 / np.cos(x) ** 2,
+    np.arcsin: lambda x: 1 / np.sqrt(1 - x**2),
+    np.arccos: lambda x: -1 / np.sqrt(1 - x**2),
+    np.arctan: lambda x: 1 / (1 + x**2),
+    np.sinh: np.cosh,
+    np.cosh: np.sinh,
+    np.tanh: lambda x: 1 / np.cosh(x) ** 2,
+    np.absolute: np.sign,
+    np.square: lambda x: 2 * x,
+    np.negative: lambda x: -np.ones_like(x),
+}
+BINARY = {
+    np.add: lambda a, b: Dual.__add__(a, b) if isinstance(a, Dual) else b + a,
+    np.subtract: lambda a, b: a - b if isinstance(a, Dual) else -b + a,
+    np.multiply: lambda a, b: Dual.__mul__(a, b) if isinstance(a, Dual) else b * a,
+    np.true_divide: lambda a, b: a / b if isinstance(a, Dual) else b.__rtruediv__(a),
+    np.power: lambda a, b: a ** b if isinstance(a, Dual) else b.__rpow__(a),
+}
+
+
+def _dual_parts(result, directions: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Value and derivatives of function result:
+    dual number, array of dual numbers or constant.
+    """
+
+    if isinstance(result, np.ndarray) and result.dtype == object:
+        parts = [_dual_parts(item, directions) for item in result.ravel()]
+        return (
+            np.array([value for value, _ in parts]).reshape(result.shape),
+            np.array([slope for _, slope in parts]).reshape(
+                result.shape + (directions,)
+            ),
+        )
+    result = Dual.lift(result, directions)
+    return result.value, result.derivatives
+
+
+def derivative(
+    epsilon: Optional[float] = None,
+    scheme: str = "forward",
+    accuracy: Optional[int] = None,
+    order: int = 1,
+    mode: str = "difference",
+):
     """
     Decorator (for function) which
     calculate derivative (calc by definition)
     in some x point with param epsilon.
 
+    Without epsilon step is chosen by Richardson
+    extrapolation of differences with steps
+    h, h / 2, ..., all points are evaluated in
+    one call if function accepts numpy arrays.
+
+    >> @derivative(scheme="central", accuracy=4)
+    >> def func(x):
+    >>     return np.cos(x)
+
+    With mode="dual" function is called once with
+    a dual number and derivative is exact.
+
     :param epsilon: accuracy for calculation.
+    :param scheme: "forward", "backward" or "central"
+    :param accuracy: order of error of the stencil,
+                     2 for "central" and 1 for others by default
+    :param order: order of derivative
+    :param mode: "difference" or "dual"
     :return: result of derivative.
     """
 
+    if mode == "dual" and order != 1:
+        raise ValueError("Dual numbers give only first derivative!")
+
+    if accuracy is None:
+        accuracy = 2 if scheme == "central" else 1
+
+    points = offsets(scheme, accuracy, order)
+    weights = stencil(points, order)
+    points = np.array(points)[weights != 0]
+    weights = weights[weights != 0]
+
     def inner(function: Callable):
         def wrapper(arg: Union[int, float]) -> float:
-            return (function(arg + epsilon) - function(arg)) / epsilon
+            if mode == "dual":
+                return float(_dual_parts(function(Dual(arg, [1.0])), 1)[1][0])
+
+            h = _steps(np.asarray(arg, dtype=float), epsilon)
+            values = _evaluate(function, arg + np.outer(points, h).ravel())
+            estimates = weights @ values.reshape(len(points), -1) / h**order
+            return float(_extrapolate(estimates, scheme, accuracy))
 
         return wrapper
 
     return inner
 
 
+def jacobian(
+    function: Callable,
+    x: np.ndarray,
+    epsilon: Optional[float] = None,
+    scheme: str = "central",
+    accuracy: int = 2,
+    mode: str = "difference",
+) -> np.ndarray:
+    """
+    Jacobian matrix of function R^n -> R^m at x.
+    Function gets array of shape (n, k), k points
+    by columns, and returns (m, k) or (k,) array.
+    All perturbed points are evaluated in one call.
+
+    >> jacobian(lambda x: np.array([x[0] * x[1], x[1] ** 2]), [1, 2])
+
+    With mode="dual" function gets dual number with
+    n directions and the Jacobian is exact.
+
+    :param function: vectorized function
+    :param x: point, n coordinates
+    :param epsilon: step, by default Richardson extrapolation
+    :param scheme: "forward", "backward" or "central"
+    :param accuracy: order of error of the stencil
+    :param mode: "difference" or "dual"
+    :return: (m, n) matrix, (n,) gradient for scalar function
+    """
+
+    x = np.asarray(x, dtype=float)
+    if mode == "dual":
+        return _dual_parts(function(Dual(x, np.eye(len(x)))), len(x))[1]
+
+    points = offsets(scheme, accuracy)
+    weights = stencil(points)
+    points = np.array(points)[weights != 0]
+    weights = weights[weights != 0]
+
+    h = _steps(x, epsilon)
+    n, levels = h.shape
+    shifts = np.einsum("ij,o,jl->iojl", np.eye(n), points, h).reshape(n, -1)
+    values = _evaluate(function, x[:, None] + shifts)
+    values = values.reshape(values.shape[:-1] + (len(points), n, levels))
+
+    estimates = np.moveaxis(values, -3, -1) @ weights / h
+    return _extrapolate(estimates, scheme, accuracy)
+
+
+def gradient(
+    function: Callable,
+    x: np.ndarray,
+    epsilon: Optional[float] = None,
+    scheme: str = "central",
+    accuracy: int = 2,
+    mode: str = "difference",
+) -> np.ndarray:
+    """
+    Gradient of scalar function R^n -> R at x,
+    see jacobian.
+    """
+
+    return jacobian(function, x, epsilon, scheme, accuracy, mode)
+
+
+def hessian(
+    function: Callable, x: np.ndarray, epsilon: Optional[float] = None
+) -> np.ndarray:
+    """
+    Hessian matrix of scalar function R^n -> R at x
+    by central differences
+    (f(x + hi + hj) - f(x + hi - hj) - f(x - hi + hj) + f(x - hi - hj)) / 4 hi hj.
+    All perturbed points are evaluated in one call.
+
+    :param function: vectorized function, see jacobian
+    :param x: point, n coordinates
+    :param epsilon: step, by default Richardson extrapolation
+    :return: (n, n) symmetric matrix
+    """
+
+    x = np.asarray(x, dtype=float)
+    h = _steps(x, epsilon)
+    n, levels = h.shape
+    rows, columns = np.triu_indices(n)
+    signs = np.array([[1, 1], [1, -1], [-1, 1], [-1, -1]])
+
+    shifts = np.zeros((n, 4, len(rows), levels))
+    pairs = np.arange(len(rows))
+    for s, (first, second) in enumerate(signs):
+        shifts[rows, s, pairs] += first * h[rows]
+        shifts[columns, s, pairs] += second * h[columns]
+    values = _evaluate(function, x[:, None] + shifts.reshape(n, -1))
+    values = values.reshape(4, len(rows), levels)
+
+    estimates = np.einsum("s,spl->pl", signs.prod(axis=1), values) / (
+        4 * h[rows] * h[columns]
+    )
+    result = np.zeros((n, n))
+    result[rows, columns] = _extrapolate(estimates, "central", 2)
+    result[columns, rows] = result[rows, columns]
+    return result
+
+
 class TestDerivative(unittest.TestCase):
     """
     Test of derivatives methods.
@@ -44,6 +480,93 @@ class TestDerivative(unittest.TestCase):
 
         self.assertEqual(func(0), 0.0)
 
+    def test_stencils(self) -> None:
+        """
+        Tests of central, higher-order and automatic steps.
+
+        :return: None
+        """
+
+        @derivative(epsilon=1e-3, scheme="central", accuracy=4)
+        def central(x_val):
+            return np.sin(x_val)
+
+        @derivative()
+        def automatic(x_val):
+            return cos(x_val)
+
+        @derivative(scheme="central", accuracy=2, order=2)
+        def second(x_val):
+            return np.exp(x_val)
+
+        self.assertAlmostEqual(central(1), np.cos(1), places=11)
+        self.assertAlmostEqual(automatic(1), -np.sin(1), places=10)
+        self.assertAlmostEqual(second(1), np.e, places=8)
+
+        @derivative(scheme="central")
+        def default(x_val):
+            return np.sin(x_val)
+
+        @derivative(scheme="backward")
+        def backward(x_val):
+            return np.sin(x_val)
+
+        self.assertAlmostEqual(default(1), np.cos(1), places=10)
+        self.assertAlmostEqual(backward(1), np.cos(1), places=8)
+
+    def test_jacobian(self) -> None:
+        """
+        Tests of gradient, Jacobian and Hessian.
+
+        :return: None
+        """
+
+        calls = []
+
+        def func(x):
+            calls.append(x.shape)
+            return np.array([x[0] ** 2 * x[1], np.sin(x[0]) + x[1] ** 3])
+
+        expected = np.array([[4, 1], [np.cos(1), 12]])
+        np.testing.assert_allclose(jacobian(func, [1, 2]), expected, rtol=1e-10)
+        self.assertEqual(len(calls), 1)
+
+        def scalar(x):
+            return x[0] ** 2 * x[1] + np.exp(x[1])
+
+        np.testing.assert_allclose(
+            gradient(scalar, [1, 2]), [4, 1 + np.exp(2)], rtol=1e-10
+        )
+        np.testing.assert_allclose(
+            hessian(scalar, [1, 2]), [[4, 2], [2, np.exp(2)]], rtol=1e-8
+        )
+
+    def test_dual(self) -> None:
+        """
+        Tests of forward-mode differentiation by dual numbers.
+
+        :return: None
+        """
+
+        @derivative(mode="dual")
+        def func(x_val):
+            return np.sin(x_val) * x_val**2 / (1 + np.exp(-x_val))
+
+        @derivative(scheme="central", accuracy=6)
+        def difference(x_val):
+            return np.sin(x_val) * x_val**2 / (1 + np.exp(-x_val))
+
+        self.assertAlmostEqual(func(0.7), difference(0.7), places=9)
+
+        def vector(x):
+            return np.array([x[0] ** 2 * x[1], np.sin(x[0]) + 2 ** x[1]])
+
+        np.testing.assert_allclose(
+            jacobian(vector, [1, 2], mode="dual"),
+            [[4, 1], [np.cos(1), 4 * np.log(2)]],
+            rtol=1e-15,
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,14 +4,22 @@ of algorithms for calculating the numerical
 value of a definite integral.
 
 Here you'll find Rectangle, Trapezium,
-Simpson and Gauss methods.
+Simpson and Gauss methods, and adaptive
+Simpson, Gauss-Kronrod and Romberg methods.
+Integrals over boxes are calculated by
+tensor-product rules and quasi-Monte Carlo.
 
 See more about methods here:
 https://en.wikipedia.org/wiki/Numerical_integration
 """
 
-from typing import List, Union, Callable, Dict, Tuple, Generator
+from typing import Union, Callable, Tuple, Generator, NamedTuple, Optional, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from math import exp
+import unittest
+
+import numpy as np
 
 
 def lin_space(start: float, stop: float, n: int) -> Generator:
@@ -36,7 +44,115 @@ def lin_space(start: float, stop: float, n: int) -> Generator:
         yield start + step * i
 
 
-def integration(method: Callable, bounds: Tuple, steps: int = 10):
+def as_vectorized(function: Callable, parameters=None) -> Callable:
+    """
+    Wrap function, so it is called once on a whole
+    numpy array of points (ufunc-style). Functions,
+    which accept only scalars (math.exp, if-statements),
+    fall back to np.vectorize.
+
+    >> as_vectorized(np.exp)(np.array([0, 1]))    # one call
+    >> as_vectorized(math.exp)(np.array([0, 1]))  # np.vectorize
+
+    With parameters function is f(x, p), parameters
+    are broadcast against points, so a column of
+    m parameters gives (m x points) array of values.
+
+    :param function: integrand f(x) or f(x, p)
+    :param parameters: p, scalar or array
+    :return: callable f(points) -> array of values
+    """
+
+    if parameters is None and getattr(function, "vectorized", False):
+        return function
+
+    scalar = np.vectorize(function, otypes=[float])
+    scalar_only = False
+
+    def wrapper(points: np.ndarray) -> np.ndarray:
+        nonlocal scalar_only
+        args = (points,) if parameters is None else (points, parameters)
+        if not scalar_only:
+            try:
+                return np.broadcast_to(
+                    function(*args), np.broadcast_shapes(*map(np.shape, args))
+                )
+            except (TypeError, ValueError):
+                scalar_only = True
+        return scalar(*args)
+
+    wrapper.vectorized = True
+    return wrapper
+
+
+class Estimate(NamedTuple):
+    """
+    Result of an adaptive method: value of
+    the integral, estimate of its absolute
+    error and amount of function evaluations.
+    """
+
+    value: float
+    error: float
+    evaluations: int
+
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+def _integrate_chunk(
+    method: Callable,
+    function: Callable,
+    start: float,
+    stop: float,
+    steps: int,
+    vectorized: bool,
+    options: dict,
+    arg=None,
+):
+    """
+    Build grid of `steps` points on [start, stop]
+    and integrate function on it by method.
+    Module level, so process pools can pickle it.
+    """
+
+    if np.ndim(arg):
+        arg, vectorized = np.asarray(arg)[:, None], True
+
+    if vectorized:
+        points = np.linspace(start, stop, steps)
+        function = as_vectorized(function, arg)
+    else:
+        points = list(lin_space(start, stop, steps))
+        if arg is not None:
+            function = partial(_with_parameter, function, arg)
+    length = abs(points[0] - points[1])
+    return method(function, points, length, **options)
+
+
+def _with_parameter(function: Callable, arg, x):
+    return function(x, arg)
+
+
+def _combine(results: list):
+    """
+    Sum partial results in the order of chunks.
+    """
+
+    if isinstance(results[0], Estimate):
+        return Estimate(*(sum(field) for field in zip(*results)))
+    return sum(results)
+
+
+def integration(
+    method: Callable,
+    bounds: Tuple,
+    steps: int = 10,
+    vectorized: bool = False,
+    executor: Union[str, Executor, None] = None,
+    chunk: int = 10_000,
+    **options,
+):
     """
     Decorator for function, which integrate your function.
     Get method(rectangle, trapezium, simpson, quad_gauss),
@@ -48,9 +164,49 @@ def integration(method: Callable, bounds: Tuple, steps: int = 10):
     >>
     >> foo() # 1.7 ...
 
+    With vectorized=True the grid is a numpy array
+    and the function is called once on all points.
+
+    >> @integration(simpson, (0, 1), steps=10**6, vectorized=True)
+    >> def bar(x: np.ndarray) -> np.ndarray:
+    >>    return np.exp(x)
+
+    Options are passed to the method, adaptive
+    methods take the grid as initial partition
+    and return Estimate(value, error, evaluations).
+
+    >> @integration(gauss_kronrod, (0, 1), steps=2, atol=1e-12)
+    >> @integration(quad_gauss, (0, 1), steps=11, order=8)
+
+    With executor the grid is split into chunks of
+    `chunk` panels, which are integrated concurrently
+    and summed in the order of chunks. For "process"
+    the function has to be picklable, so decorate it
+    by call: integration(...)(module_level_function).
+    Tolerances of adaptive methods apply per chunk,
+    for simpson chunk is rounded up to even.
+
+    >> @integration(trapezium, (0, 1), steps=10**5, executor="thread")
+
+    Argument of decorated function is a parameter p
+    of function f(x, p). Array of parameters gives
+    array of integrals, fixed-grid rules evaluate
+    (parameters x grid) array in one vectorized call,
+    adaptive methods give Estimate of arrays.
+
+    >> @integration(simpson, (0, 1), steps=1001)
+    >> def baz(x, p):
+    >>    return np.exp(p * x)
+    >>
+    >> baz(np.linspace(0, 1, 10**4))  # 10**4 integrals
+
     :param method: integrate func
     :param bounds: (a, b), a < b | int or float
     :param steps: int
+    :param vectorized: evaluate function on numpy arrays
+    :param executor: "thread", "process" or instance of Executor
+    :param chunk: amount of panels in one task of executor
+    :param options: keyword arguments of method
     :return: calculating the numerical
              value of a definite integral
     """
@@ -60,23 +216,65 @@ def integration(method: Callable, bounds: Tuple, steps: int = 10):
             f"Left(={bounds[0]}) bound have to be more than right(={bounds[1]})!"
         )
 
+    if chunk < 1:
+        raise ValueError(f"Chunk(={chunk}) have to be positive!")
+    if method is simpson:
+        chunk += chunk % 2
+
     def inner(function: Callable):
-        def wrapper(arg: Union[int, float] = 0) -> float:
+        def wrapper(
+            arg: Union[int, float, np.ndarray, None] = None,
+        ) -> Union[float, np.ndarray]:
             """
             Divide interval in n(=step) points,
             then calculate length between two points
             and call function(=method).
             """
 
-            points = list(
-                lin_space(
+            if np.ndim(arg) and method not in GRID_RULES:
+                results = [wrapper(parameter) for parameter in arg]
+                if isinstance(results[0], Estimate):
+                    return Estimate(*map(np.array, zip(*results)))
+                return np.array(results)
+
+            if executor is None:
+                return _integrate_chunk(
+                    method,
+                    function,
                     bounds[0],
                     bounds[1],
-                    steps if method.__name__ != quad_gauss.__name__ else 5,
+                    steps,
+                    vectorized,
+                    options,
+                    arg,
                 )
-            )
-            length = abs(points[0] - points[1])
-            return method(function, points, length)
+
+            step = (bounds[1] - bounds[0]) / (steps - 1)
+            edges = list(range(0, steps - 1, chunk)) + [steps - 1]
+            tasks = [
+                (bounds[0] + step * i, bounds[0] + step * j, j - i + 1)
+                for i, j in zip(edges, edges[1:])
+            ]
+
+            def run(pool: Executor):
+                futures = [
+                    pool.submit(
+                        _integrate_chunk,
+                        method,
+                        function,
+                        *task,
+                        vectorized,
+                        options,
+                        arg,
+                    )
+                    for task in tasks
+                ]
+                return _combine([future.result() for future in futures])
+
+            if isinstance(executor, str):
+                with EXECUTORS[executor]() as pool:
+                    return run(pool)
+            return run(executor)
 
         return wrapper
 
@@ -84,10 +282,15 @@ def integration(method: Callable, bounds: Tuple, steps: int = 10):
 
 
 def rectangle(func: Callable, points: list, length: float) -> Union[float, int]:
-    return sum(func(x - length / 2) for x in points) * length
+    if isinstance(points, np.ndarray):
+        return func(points[1:] - length / 2).sum(axis=-1) * length
+    return sum(func(x - length / 2) for x in points[1:]) * length
 
 
 def trapezium(func: Callable, points: list, length: float) -> Union[float, int]:
+    if isinstance(points, np.ndarray):
+        values = func(points)
+        return (values.sum(axis=-1) - 0.5 * (values[..., 0] + values[..., -1])) * length
     return (
         0.5 * func(points[0])
         + sum(func(x) for x in points[1:-1])
@@ -96,6 +299,18 @@ def trapezium(func: Callable, points: list, length: float) -> Union[float, int]:
 
 
 def simpson(func: Callable, points: list, length: float) -> Union[float, int]:
+    if isinstance(points, np.ndarray):
+        values = func(points)
+        return (
+            (
+                values[..., 0]
+                + 4 * values[..., 1:-1:2].sum(axis=-1)
+                + 2 * values[..., 2:-1:2].sum(axis=-1)
+                + values[..., -1]
+            )
+            * length
+            / 3
+        )
     return (
         (
             func(points[0])
@@ -110,19 +325,737 @@ def simpson(func: Callable, points: list, length: float) -> Union[float, int]:
     )
 
 
-def quad_gauss(func: Callable, points: list, length: float) -> Union[float, int]:
-    left, right = points[0], points[-1]
-    root_polynomial_legendre = [0.906180, -0.906180, 0.538469, -0.538469, 0]
-    values: Dict[str, List] = {
-        "c": [0.236927, 0.236927, 0.478629, 0.478629, 0.568889],
-        "x": [x * (right - left) / 2 + (left + right) / 2 for x in root_polynomial_legendre],
-    }
+@lru_cache(maxsize=32)
+def legendre(order: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Roots of Legendre polynomial of given order
+    and weights of Gauss method on [-1, 1],
+    computed in double precision once per order.
 
-    return (
-        (right - left) / 2 * sum(c * func(x) for c, x in zip(values["c"], values["x"]))
+    :param order: amount of nodes
+    :return: (nodes, weights), read-only arrays
+    """
+
+    if order < 1:
+        raise ValueError(f"Order(={order}) of Gauss method have to be positive!")
+
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    nodes.flags.writeable = weights.flags.writeable = False
+    return nodes, weights
+
+
+def quad_gauss(
+    func: Callable, points: list, length: float, order: int = 5
+) -> Union[float, int]:
+    """
+    Composite Gauss-Legendre method, every panel
+    between two points gets `order` nodes.
+
+    :param order: amount of nodes in a panel
+    """
+
+    roots, weights = legendre(order)
+    if isinstance(points, np.ndarray):
+        centre, radius = (points[1:] + points[:-1]) / 2, np.diff(points) / 2
+        nodes = centre[:, None] + radius[:, None] * roots
+        values = func(nodes.ravel())
+        values = values.reshape(values.shape[:-1] + nodes.shape)
+        return (values @ weights) @ radius
+
+    return sum(
+        (right - left)
+        / 2
+        * sum(
+            c * func(x * (right - left) / 2 + (left + right) / 2)
+            for c, x in zip(weights.tolist(), roots.tolist())
+        )
+        for left, right in zip(points, points[1:])
+    )
+
+
+GRID_RULES = (rectangle, trapezium, simpson, quad_gauss)
+
+
+def _tolerance(atol: float, rtol: float, value: float) -> float:
+    return max(atol, rtol * abs(value))
+
+
+def adaptive_simpson(
+    func: Callable,
+    points: list,
+    length: float,
+    atol: float = 1e-10,
+    rtol: float = 1e-10,
+    limit: int = 100_000,
+) -> Estimate:
+    """
+    Adaptive Simpson method. Every panel is compared
+    with its two halves, panels whose error is more
+    than their share of the tolerance are bisected.
+    Halves reuse three of five values of the parent,
+    so one bisection costs four function calls.
+
+    :param atol: absolute tolerance
+    :param rtol: relative tolerance
+    :param limit: maximum amount of function evaluations
+    """
+
+    func = as_vectorized(func)
+    grid = np.asarray(points, dtype=float)
+    a, b = grid[:-1], grid[1:]
+    width = grid[-1] - grid[0]
+
+    nodes = np.linspace(a, b, 5, axis=-1)
+    values = func(nodes.ravel()).reshape(nodes.shape)
+    evaluations = values.size
+
+    total, error = 0.0, 0.0
+    while True:
+        h = (b - a)[:, None]
+        coarse = h[:, 0] / 6 * (values[:, 0] + 4 * values[:, 2] + values[:, 4])
+        fine = h[:, 0] / 12 * (values @ np.array([1, 4, 2, 4, 1]))
+        local = np.abs(fine - coarse) / 15
+
+        tolerance = _tolerance(atol, rtol, total + fine.sum())
+        split = local > tolerance * (b - a) / width
+        if evaluations + 4 * split.sum() > limit:
+            split[:] = False
+
+        done = ~split
+        total += (fine[done] + (fine[done] - coarse[done]) / 15).sum()
+        error += local[done].sum()
+        if not split.any():
+            return Estimate(total, error, evaluations)
+
+        a, b, values = a[split], b[split], values[split]
+        middle = (a + b) / 2
+        a, b = np.concatenate((a, middle)), np.concatenate((middle, b))
+        left, right = values[:, :3], values[:, 2:]
+        h = (b - a)[:, None]
+        quarters = a[:, None] + h * np.array([0.25, 0.75])
+        new = func(quarters.ravel()).reshape(quarters.shape)
+        evaluations += new.size
+
+        parents = np.concatenate((left, right))
+        values = np.column_stack(
+            (parents[:, 0], new[:, 0], parents[:, 1], new[:, 1], parents[:, 2])
+        )
+
+
+def romberg(
+    func: Callable,
+    points: list,
+    length: float,
+    atol: float = 1e-10,
+    rtol: float = 1e-10,
+    levels: int = 20,
+) -> Estimate:
+    """
+    Romberg method. Starts with trapezium on the grid,
+    every level halves the step and evaluates only
+    new midpoints. Richardson extrapolation table
+    is kept row by row, the method stops once two
+    last extrapolated values agree with tolerance.
+
+    :param atol: absolute tolerance
+    :param rtol: relative tolerance
+    :param levels: maximum amount of step halvings
+    """
+
+    func = as_vectorized(func)
+    grid = np.asarray(points, dtype=float)
+    row = [trapezium(func, grid, length)]
+    evaluations, panels = grid.size, grid.size - 1
+
+    error = np.inf
+    for _ in range(levels):
+        midpoints = grid[0] + length * (np.arange(panels) + 0.5)
+        evaluations += panels
+
+        new_row = [row[0] / 2 + length / 2 * func(midpoints).sum()]
+        for j, previous in enumerate(row, start=1):
+            new_row.append(new_row[-1] + (new_row[-1] - previous) / (4**j - 1))
+
+        error = abs(new_row[-1] - row[-1])
+        row, length, panels = new_row, length / 2, panels * 2
+        if error <= _tolerance(atol, rtol, row[-1]):
+            break
+
+    return Estimate(row[-1], error, evaluations)
+
+
+GAUSS_KRONROD_NODES = np.array(
+    [
+        0.991455371120812639206854697526329,
+        0.949107912342758524526189684047851,
+        0.864864423359769072789712788640926,
+        0.741531185599394439863864773280788,
+        0.586087235467691130294144845693013,
+        0.405845151377397166906606412076961,
+        0.207784955007898467600689403773245,
+        0.000000000000000000000000000000000,
+    ]
+)
+KRONROD_WEIGHTS = np.array(
+    [
+        0.022935322010529224963732008058970,
+        0.063092092629978553290700663189204,
+        0.104790010322250183839876322541518,
+        0.140653259715525918745189590510238,
+        0.169004726639267902826583426598550,
+        0.190350578064785409913256402421014,
+        0.204432940075298892414161999234649,
+        0.209482141084727828012999174891714,
+    ]
+)
+GAUSS_WEIGHTS = np.array(
+    [
+        0.129484966168869693270611432679082,
+        0.279705391489276667901467771423780,
+        0.381830050505118944950369775488975,
+        0.417959183673469387755102040816327,
+    ]
+)
+
+
+def gauss_kronrod(
+    func: Callable,
+    points: list,
+    length: float,
+    atol: float = 1e-10,
+    rtol: float = 1e-10,
+    limit: int = 100_000,
+) -> Estimate:
+    """
+    Adaptive Gauss-Kronrod (7, 15) method. Kronrod
+    rule reuses all 7 Gauss nodes, the difference
+    of two rules is an error estimate of the panel.
+    Panels with too large error are bisected.
+
+    :param atol: absolute tolerance
+    :param rtol: relative tolerance
+    :param limit: maximum amount of function evaluations
+    """
+
+    func = as_vectorized(func)
+    grid = np.asarray(points, dtype=float)
+    a, b = grid[:-1], grid[1:]
+    width = grid[-1] - grid[0]
+
+    x = np.concatenate((-GAUSS_KRONROD_NODES[:-1], GAUSS_KRONROD_NODES[::-1]))
+    kronrod = np.concatenate((KRONROD_WEIGHTS[:-1], KRONROD_WEIGHTS[::-1]))
+    gauss = np.zeros_like(kronrod)
+    gauss[1::2] = np.concatenate((GAUSS_WEIGHTS[:-1], GAUSS_WEIGHTS[::-1]))
+
+    total, error, evaluations = 0.0, 0.0, 0
+    while True:
+        centre, radius = (a + b) / 2, (b - a) / 2
+        nodes = centre[:, None] + radius[:, None] * x
+        values = func(nodes.ravel()).reshape(nodes.shape)
+        evaluations += values.size
+
+        fine, coarse = radius * (values @ kronrod), radius * (values @ gauss)
+        local = np.abs(fine - coarse)
+
+        tolerance = _tolerance(atol, rtol, total + fine.sum())
+        split = local > tolerance * (b - a) / width
+        if evaluations + 30 * split.sum() > limit:
+            split[:] = False
+
+        total += fine[~split].sum()
+        error += local[~split].sum()
+        if not split.any():
+            return Estimate(total, error, evaluations)
+
+        a, b = a[split], b[split]
+        a, b = np.concatenate((a, centre[split])), np.concatenate((centre[split], b))
+
+
+def rule(
+    method: Callable, start: float, stop: float, steps: int, **options
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nodes and weights of fixed-grid rule on
+    [start, stop] with `steps` points, so that
+    method(func, ...) == weights @ func(nodes).
+
+    :param method: rectangle, trapezium, simpson or quad_gauss
+    :return: (nodes, weights)
+    """
+
+    grid = np.linspace(start, stop, steps)
+    length = abs(grid[0] - grid[1])
+
+    if method is rectangle:
+        return grid[1:] - length / 2, np.full(steps - 1, length)
+    if method is trapezium:
+        weights = np.full(steps, length)
+        weights[[0, -1]] /= 2
+        return grid, weights
+    if method is simpson:
+        weights = np.full(steps, length / 3)
+        weights[1:-1:2] *= 4
+        weights[2:-1:2] *= 2
+        return grid, weights
+    if method is quad_gauss:
+        roots, weights = legendre(options.get("order", 5))
+        centre, radius = (grid[1:] + grid[:-1]) / 2, np.diff(grid) / 2
+        nodes = centre[:, None] + radius[:, None] * roots
+        return nodes.ravel(), (radius[:, None] * weights).ravel()
+
+    raise ValueError(f"Method {method} isn't a fixed-grid rule!")
+
+
+def _box(bounds: Sequence[Tuple]) -> Tuple[np.ndarray, np.ndarray]:
+    lower, upper = np.asarray(bounds, dtype=float).T
+    if np.any(lower > upper):
+        raise Exception(f"Left bounds have to be less than right in {bounds}!")
+    return lower, upper
+
+
+def integrate_box(
+    function: Callable,
+    bounds: Sequence[Tuple],
+    method: Callable = trapezium,
+    steps: int = 10,
+    block: int = 2**16,
+    **options,
+) -> float:
+    """
+    Tensor product of fixed-grid rule over the box
+    [a1, b1] x ... x [ad, bd]. Function gets array x
+    of shape (d, block), x[0], ..., x[d - 1] are
+    coordinates, and returns array of block values.
+
+    >> integrate_box(lambda x: np.exp(x[0] * x[1]), [(0, 1), (0, 2)], simpson)
+
+    Nodes are generated and evaluated by blocks,
+    so memory doesn't depend on steps ** d.
+
+    :param function: vectorized integrand f(x)
+    :param bounds: [(a1, b1), ..., (ad, bd)]
+    :param method: rectangle, trapezium, simpson or quad_gauss
+    :param steps: amount of points in every dimension
+    :param block: amount of nodes in one evaluation
+    :return: value of integral
+    """
+
+    rules = [rule(method, a, b, steps, **options) for a, b in zip(*_box(bounds))]
+    shape = tuple(len(nodes) for nodes, _ in rules)
+
+    total = 0.0
+    for start in range(0, int(np.prod(shape)), block):
+        index = np.unravel_index(
+            np.arange(start, min(start + block, int(np.prod(shape)))), shape
+        )
+        x = np.array([nodes[i] for (nodes, _), i in zip(rules, index)])
+        weights = np.prod([w[i] for (_, w), i in zip(rules, index)], axis=0)
+        total += weights @ function(x)
+    return total
+
+
+SOBOL_BITS = 32
+# Primitive polynomials (degree, coefficients) and initial
+# direction numbers for dimensions 2..10 by Joe and Kuo.
+SOBOL_POLYNOMIALS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+)
+HALTON_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53)
+
+
+@lru_cache(maxsize=32)
+def sobol_directions(dimension: int) -> np.ndarray:
+    """
+    Direction numbers of Sobol sequence,
+    (dimension x SOBOL_BITS) integer array.
+    """
+
+    if not 0 < dimension <= len(SOBOL_POLYNOMIALS) + 1:
+        raise ValueError("Sobol sequence supports up to 10 dimensions!")
+
+    directions = np.zeros((dimension, SOBOL_BITS), dtype=np.uint64)
+    directions[0] = [1 << (SOBOL_BITS - 1 - i) for i in range(SOBOL_BITS)]
+    for d, (degree, coefficients, initial) in enumerate(
+        SOBOL_POLYNOMIALS[: dimension - 1], start=1
+    ):
+        v = [m << (SOBOL_BITS - 1 - i) for i, m in enumerate(initial)]
+        for i in range(degree, SOBOL_BITS):
+            value = v[i - degree] ^ (v[i - degree] >> degree)
+            for k in range(1, degree):
+                if (coefficients >> (degree - 1 - k)) & 1:
+                    value ^= v[i - k]
+            v.append(value)
+        directions[d] = v
+    directions.flags.writeable = False
+    return directions
+
+
+def sobol(start: int, stop: int, dimension: int) -> np.ndarray:
+    """
+    Points from start to stop of Sobol sequence
+    in [0, 1) ** dimension, (dimension x n) array.
+    Gray code makes every point XOR of directions.
+    """
+
+    index = np.arange(start, stop, dtype=np.uint64)
+    gray = index ^ (index >> np.uint64(1))
+    points = np.zeros((dimension, len(index)), dtype=np.uint64)
+    for bit, direction in enumerate(sobol_directions(dimension).T):
+        points ^= direction[:, None] * ((gray >> np.uint64(bit)) & np.uint64(1))
+    return points / 2.0**SOBOL_BITS
+
+
+def halton(start: int, stop: int, dimension: int) -> np.ndarray:
+    """
+    Points from start to stop of Halton sequence
+    in [0, 1) ** dimension, (dimension x n) array.
+    Coordinate d is radical inverse in base of d-th prime.
+    """
+
+    if not 0 < dimension <= len(HALTON_PRIMES):
+        raise ValueError(
+            f"Halton sequence supports up to {len(HALTON_PRIMES)} dimensions!"
+        )
+
+    points = np.zeros((dimension, stop - start))
+    for d, base in enumerate(HALTON_PRIMES[:dimension]):
+        index = np.arange(start + 1, stop + 1)
+        scale = 1.0
+        while index.any():
+            scale /= base
+            index, digit = np.divmod(index, base)
+            points[d] += digit * scale
+    return points
+
+
+SEQUENCES = {"sobol": sobol, "halton": halton}
+
+
+def quasi_monte_carlo(
+    function: Callable,
+    bounds: Sequence[Tuple],
+    samples: int = 2**16,
+    sequence: str = "sobol",
+    block: int = 2**14,
+    seed: Optional[int] = None,
+    replicates: int = 8,
+) -> Estimate:
+    """
+    Randomized quasi-Monte Carlo method over the box
+    [a1, b1] x ... x [ad, bd]. Function gets array x
+    of shape (d, block) like in integrate_box.
+
+    Samples are shared by `replicates` copies of the
+    sequence, every copy gets its own random shift
+    modulo 1. Value is the mean of replicate estimates,
+    error is their standard error (points of one
+    sequence aren't independent, so spread of values
+    inside of it says nothing about the error).
+
+    Points are generated and evaluated by blocks,
+    so memory doesn't depend on samples.
+
+    :param function: vectorized integrand f(x)
+    :param bounds: [(a1, b1), ..., (ad, bd)]
+    :param samples: amount of points of all replicates
+    :param sequence: "sobol" or "halton"
+    :param block: amount of points in one evaluation
+    :param seed: seed of random shifts
+    :param replicates: amount of independently shifted copies
+    :return: Estimate(value, error, evaluations)
+    """
+
+    if not 1 < replicates <= samples:
+        raise ValueError(
+            f"Replicates(={replicates}) have to be from 2 to samples(={samples})!"
+        )
+
+    lower, upper = _box(bounds)
+    shifts = np.random.default_rng(seed).random((replicates, len(lower), 1))
+    size = samples // replicates
+
+    sums = np.zeros(replicates)
+    for start in range(0, size, block):
+        unit = SEQUENCES[sequence](start, min(start + block, size), len(lower))
+        for replicate, shift in enumerate(shifts):
+            x = lower[:, None] + (upper - lower)[:, None] * ((unit + shift) % 1)
+            sums[replicate] += function(x).sum()
+
+    values = np.prod(upper - lower) * sums / size
+    return Estimate(
+        values.mean(), values.std(ddof=1) / np.sqrt(replicates), replicates * size
     )
 
 
+class IntegrationTestCase(unittest.TestCase):
+    """
+    Tests for fixed-grid rules, executors and adaptive methods.
+    """
+
+    def setUp(self) -> None:
+        self.exact = np.e - 1
+
+    def test_rules(self) -> None:
+        """
+        Test of every fixed-grid rule on exp in both modes.
+        :return: None
+        """
+
+        for method, tolerance in (
+            (rectangle, 1e-5),
+            (trapezium, 2e-5),
+            (simpson, 1e-9),
+            (quad_gauss, 1e-14),
+        ):
+            for vectorized, function in ((False, exp), (True, np.exp)):
+                value = integration(method, (0, 1), 101, vectorized)(function)()
+                self.assertAlmostEqual(value, self.exact, delta=tolerance)
+
+        for vectorized, function in ((False, exp), (True, np.exp)):
+            midpoint = integration(rectangle, (0, 1), 2, vectorized)(function)()
+            self.assertAlmostEqual(midpoint, np.exp(0.5), places=14)
+
+    def test_executor(self) -> None:
+        """
+        Test of chunked integration against serial one, chunks
+        don't divide the grid and chunk of simpson is odd.
+        :return: None
+        """
+
+        for method in GRID_RULES:
+            for vectorized, function in ((False, exp), (True, np.exp)):
+                serial = integration(method, (0, 1), 101, vectorized)(function)()
+                for chunk in (1, 7, 100, 1000):
+                    value = integration(
+                        method, (0, 1), 101, vectorized, "thread", chunk
+                    )(function)()
+                    self.assertAlmostEqual(value, serial, places=12)
+
+        serial = integration(gauss_kronrod, (0, 1), 101)(exp)()
+        chunked = integration(gauss_kronrod, (0, 1), 101, executor="thread", chunk=7)(
+            exp
+        )()
+        self.assertIsInstance(chunked, Estimate)
+        self.assertAlmostEqual(chunked.value, serial.value, places=12)
+        self.assertEqual(chunked.evaluations, serial.evaluations)
+
+        with ThreadPoolExecutor(2) as pool:
+            value = integration(trapezium, (0, 1), 101, executor=pool, chunk=9)(exp)()
+        self.assertAlmostEqual(value, integration(trapezium, (0, 1), 101)(exp)())
+
+        with self.assertRaises(ValueError):
+            integration(trapezium, (0, 1), chunk=0)
+
+    def test_parameters(self) -> None:
+        """
+        Test of array of parameters against (exp(p) - 1) / p.
+        :return: None
+        """
+
+        parameters = np.linspace(0.5, 3, 6)
+        exact = np.expm1(parameters) / parameters
+
+        for vectorized in (False, True):
+            values = integration(simpson, (0, 1), 1001, vectorized)(
+                lambda x, p: np.exp(p * x)
+            )(parameters)
+            self.assertIsInstance(values, np.ndarray)
+            np.testing.assert_allclose(values, exact, rtol=1e-10)
+
+        for method in (adaptive_simpson, romberg, gauss_kronrod):
+            estimate = integration(method, (0, 1), 5, atol=1e-12, rtol=0)(
+                lambda x, p: np.exp(p * x)
+            )(parameters)
+            self.assertIsInstance(estimate, Estimate)
+            for field in estimate:
+                self.assertIsInstance(field, np.ndarray)
+                self.assertEqual(field.shape, parameters.shape)
+            np.testing.assert_allclose(estimate.value, exact, rtol=1e-12)
+            self.assertTrue((estimate.evaluations > 0).all())
+
+        def midpoint(func: Callable, points: list, length: float) -> float:
+            return rectangle(func, points, length)
+
+        values = integration(midpoint, (0, 1), 10**4)(lambda x, p: exp(p * x))(
+            parameters
+        )
+        self.assertIsInstance(values, np.ndarray)
+        np.testing.assert_allclose(values, exact, rtol=1e-7)
+
+    def test_integrate_box(self) -> None:
+        """
+        Test of tensor-product rules over a box by blocks.
+        :return: None
+        """
+
+        exact = self.exact * (np.exp(2) - 1)
+        for method, tolerance in ((trapezium, 1e-3), (simpson, 1e-7)):
+            for block in (7, 2**16):
+                value = integrate_box(
+                    lambda x: np.exp(x[0] + x[1]),
+                    [(0, 1), (0, 2)],
+                    method,
+                    101,
+                    block,
+                )
+                self.assertAlmostEqual(value, exact, delta=tolerance)
+
+        value = integrate_box(lambda x: x[0] * x[1] * x[2], [(0, 1)] * 3, quad_gauss)
+        self.assertAlmostEqual(value, 1 / 8, places=14)
+
+        with self.assertRaises(Exception):
+            integrate_box(np.sum, [(1, 0)])
+
+    def test_sequences(self) -> None:
+        """
+        Test of first points of Sobol and Halton sequences,
+        their blocks and stratification.
+        :return: None
+        """
+
+        np.testing.assert_array_equal(
+            sobol(0, 4, 2), [[0, 0.5, 0.75, 0.25], [0, 0.5, 0.25, 0.75]]
+        )
+        np.testing.assert_allclose(
+            halton(0, 4, 2),
+            [[1 / 2, 1 / 4, 3 / 4, 1 / 8], [1 / 3, 2 / 3, 1 / 9, 4 / 9]],
+        )
+
+        for generate, dimension in ((sobol, 10), (halton, 16)):
+            points = generate(0, 2**10, dimension)
+            self.assertEqual(points.shape, (dimension, 2**10))
+            self.assertTrue(((points >= 0) & (points < 1)).all())
+            np.testing.assert_array_equal(
+                generate(100, 300, dimension), points[:, 100:300]
+            )
+
+        strata = np.sort(np.floor(sobol(0, 2**8, 10) * 2**8), axis=-1)
+        np.testing.assert_array_equal(
+            strata, np.broadcast_to(np.arange(2**8), strata.shape)
+        )
+
+        with self.assertRaises(ValueError):
+            sobol(0, 1, 11)
+        with self.assertRaises(ValueError):
+            halton(0, 1, 17)
+
+    def test_quasi_monte_carlo(self) -> None:
+        """
+        Test of randomized quasi-Monte Carlo: error of replicates
+        bounds the real error and is reproducible by seed.
+        :return: None
+        """
+
+        exact = self.exact * (np.exp(2) - 1)
+        for sequence in SEQUENCES:
+            for seed in range(10):
+                estimate = quasi_monte_carlo(
+                    lambda x: np.exp(x[0] + x[1]),
+                    [(0, 1), (0, 2)],
+                    2**12,
+                    sequence,
+                    block=100,
+                    seed=seed,
+                )
+                self.assertEqual(estimate.evaluations, 2**12)
+                self.assertGreater(estimate.error, 0)
+                self.assertLess(abs(estimate.value - exact), 5 * estimate.error)
+
+        estimates = [
+            quasi_monte_carlo(lambda x: np.exp(x[0]), [(0, 1)], samples, seed=1)
+            for samples in (2**10, 2**16, 2**16)
+        ]
+        self.assertEqual(estimates[1], estimates[2])
+        self.assertLess(estimates[1].error, estimates[0].error)
+        self.assertLess(estimates[1].error, 1e-4)
+
+        with self.assertRaises(ValueError):
+            quasi_monte_carlo(np.sum, [(0, 1)], replicates=1)
+
+    def test_combine(self) -> None:
+        """
+        Test of sum of partial results and estimates.
+        :return: None
+        """
+
+        self.assertEqual(_combine([1.5, 2.0, 0.5]), 4.0)
+        combined = _combine([Estimate(1.0, 0.25, 15), Estimate(2.0, 0.5, 30)])
+        self.assertIsInstance(combined, Estimate)
+        self.assertEqual(combined, Estimate(3.0, 0.75, 45))
+
+    def test_as_vectorized(self) -> None:
+        """
+        Test of one call on array and fallback to np.vectorize.
+        :return: None
+        """
+
+        calls = []
+
+        def function(x: np.ndarray) -> np.ndarray:
+            calls.append(np.shape(x))
+            return np.exp(x)
+
+        points = np.linspace(0, 1, 11)
+        vectorized = as_vectorized(function)
+        np.testing.assert_allclose(vectorized(points), np.exp(points))
+        self.assertListEqual(calls, [(11,)])
+        self.assertIs(as_vectorized(vectorized), vectorized)
+
+        scalar = as_vectorized(exp)
+        np.testing.assert_allclose(scalar(points), np.exp(points))
+        np.testing.assert_allclose(scalar(points[::-1]), np.exp(points[::-1]))
+
+        branch = as_vectorized(lambda x: x if x > 0.5 else 0.0)
+        np.testing.assert_allclose(branch(points), np.where(points > 0.5, points, 0))
+
+    def test_adaptive(self) -> None:
+        """
+        Test of values, error estimates and amounts of
+        evaluations of romberg, adaptive_simpson and gauss_kronrod.
+        :return: None
+        """
+
+        steps = 5
+        for method in (romberg, adaptive_simpson, gauss_kronrod):
+            for function in (exp, np.exp):
+                estimate = integration(method, (0, 1), steps, atol=1e-12, rtol=0)(
+                    function
+                )()
+                self.assertIsInstance(estimate, Estimate)
+                self.assertAlmostEqual(estimate.value, self.exact, places=12)
+                self.assertLess(estimate.error, 1e-12)
+                self.assertLessEqual(
+                    abs(estimate.value - self.exact), estimate.error + 1e-15
+                )
+
+                panels = steps - 1
+                if method is romberg:
+                    self.assertEqual((estimate.evaluations - steps) % panels, 0)
+                if method is adaptive_simpson:
+                    self.assertEqual((estimate.evaluations - 5 * panels) % 4, 0)
+                if method is gauss_kronrod:
+                    self.assertEqual(estimate.evaluations % 15, 0)
+                    self.assertGreaterEqual(estimate.evaluations, 15 * panels)
+
+        rough = integration(romberg, (0, 1), steps, atol=1e-3, rtol=0)(exp)()
+        fine = integration(romberg, (0, 1), steps, atol=1e-12, rtol=0)(exp)()
+        self.assertLess(rough.evaluations, fine.evaluations)
+
+        limited = integration(adaptive_simpson, (0, 1), 2, atol=0, rtol=0, limit=50)(
+            exp
+        )()
+        self.assertLessEqual(limited.evaluations, 50)
+        self.assertGreater(limited.error, 0)
+
+
 @integration(trapezium, (0, 1), steps=100)
 def foo(x: float) -> float:
     return exp(x)
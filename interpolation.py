@@ -3,13 +3,25 @@ Interpolation is a type of estimation,
 a method of constructing new data points
 based on the range of a discrete
 set of known data points.
+
+Functions given by callable are approximated
+by Chebyshev series on Chebyshev points, large
+tables - by piecewise linear, PCHIP and natural
+cubic spline interpolants.
 """
 
-from typing import List, Union, Callable
-from functools import reduce
+from abc import ABC, abstractmethod
+from os import PathLike
+from typing import List, Optional, Union, Callable, Tuple
+import os
+import tempfile
+import unittest
 
+import numpy as np
 from matplotlib import pyplot as plt
 
+from integration import as_vectorized
+
 
 class Interpolation:
     """
@@ -32,6 +44,16 @@ class Interpolation:
     >> function.lagrange(5)
 
     >> y_values = [function.newton(x) for x in range(100)]
+
+    Newton method takes numpy array of points too.
+
+    >> y_values = function.newton(np.linspace(1, 3, 10**6))
+
+    Lagrange method uses barycentric form, nodes can
+    be added and removed in O(n) without rebuilding.
+
+    >> function.append(4, 7)
+    >> function.remove(0)
     """
 
     def __init__(self, x_values: List[float], y_values: List[float]) -> None:
@@ -49,64 +71,739 @@ class Interpolation:
         if len(y_values) != len(x_values):
             raise ValueError("Lengths of arrays must be equal!")
 
-        self.__x: List = x_values
-        self.__y: List = y_values
+        self.__x: List = list(x_values)
+        self.__y: List = list(y_values)
+        self.__coefficients: Optional[np.ndarray] = None
+        self.__diagonal: Optional[np.ndarray] = None
+        self.__weights: Optional[np.ndarray] = None
+
+    def __divided_differences(self) -> np.ndarray:
+        """
+        Coefficients of Newton polynomial
+        f[x_0], f[x_0, x_1], ..., f[x_0, ..., x_n],
+        the table is computed once in O(n^2).
+
+        :return: array of divided differences
+        """
+
+        if self.__coefficients is None:
+            x = np.array(self.__x, dtype=float)
+            table = np.array(self.__y, dtype=float)
+            diagonal = [table[-1]]
+            for k in range(1, len(x)):
+                table[k:] = (table[k:] - table[k - 1 : -1]) / (x[k:] - x[:-k])
+                diagonal.append(table[-1])
+            self.__coefficients, self.__diagonal = table, np.array(diagonal)
+        return self.__coefficients
+
+    def __barycentric_weights(self) -> np.ndarray:
+        """
+        Weights w_j = 1 / prod(x_j - x_k, k != j)
+        of barycentric form, computed once in O(n^2).
 
-    def newton(self, point: Union[int, float]) -> float:
+        :return: array of weights
+        """
+
+        if self.__weights is None:
+            x = np.array(self.__x, dtype=float)
+            differences = x[:, None] - x
+            np.fill_diagonal(differences, 1)
+            self.__weights = 1 / differences.prod(axis=1)
+        return self.__weights
+
+    def append(self, x: Union[int, float], y: Union[int, float]) -> None:
+        """
+        Add known point (x, y) in O(n): weights are
+        divided by (x_j - x), Newton coefficients get
+        one more divided difference.
+
+        :param x: new X value
+        :param y: f(x)
+        """
+
+        if x in self.__x:
+            raise ValueError(f"Point x(={x}) is already known!")
+
+        if self.__weights is not None:
+            differences = np.array(self.__x, dtype=float) - x
+            self.__weights = np.append(
+                self.__weights / differences, 1 / np.prod(-differences)
+            )
+
+        if self.__coefficients is not None:
+            diagonal = [float(y)]
+            for k, previous in enumerate(self.__diagonal, start=1):
+                diagonal.append((diagonal[-1] - previous) / (x - self.__x[-k]))
+            self.__coefficients = np.append(self.__coefficients, diagonal[-1])
+            self.__diagonal = np.array(diagonal)
+
+        self.__x.append(x)
+        self.__y.append(y)
+
+    def remove(self, index: int) -> None:
+        """
+        Remove known point by its index, weights are
+        multiplied by (x_j - x) in O(n), Newton
+        coefficients are recomputed on next call.
+
+        :param index: index of point in X values
+        """
+
+        x = self.__x.pop(index)
+        self.__y.pop(index)
+        self.__coefficients = self.__diagonal = None
+
+        if self.__weights is not None:
+            weights = np.delete(self.__weights, index)
+            self.__weights = weights * (np.array(self.__x, dtype=float) - x)
+
+    def newton(self, point: Union[int, float, np.ndarray]) -> Union[float, np.ndarray]:
         """
         Calculate new point by Newton polynomial.
         Function gets x and returns f(x).
 
-        :param point: find function result at point
+        Polynomial is evaluated by Horner scheme in O(n)
+        on precomputed divided differences.
+
+        :param point: find function result at point(s)
+        :return: f(point)
+        """
+
+        coefficients = self.__divided_differences()
+        point = np.asarray(point, dtype=float)
+
+        polynomial = np.full_like(point, coefficients[-1])
+        for k in reversed(range(len(coefficients) - 1)):
+            polynomial = polynomial * (point - self.__x[k]) + coefficients[k]
+
+        return polynomial if polynomial.ndim else float(polynomial)
+
+    def lagrange(
+        self, point: Union[int, float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        """
+        Calculate new point by Lagrange polynomial.
+        Function gets x and returns f(x).
+
+        Polynomial is evaluated in barycentric form
+        sum(w_j y_j / (x - x_j)) / sum(w_j / (x - x_j))
+        in O(n), at known points y_j is returned.
+
+        :param point: find function result at point(s)
         :return: f(point)
         """
 
-        polynomial: float = self.__y[0]
-        for k in range(len(self.__x) - 1):
-            x_values_multiply: float = reduce(
-                lambda a, b: a * b, (point - self.__x[n_i] for n_i in range(k + 1))
+        weights = self.__barycentric_weights()
+        point = np.asarray(point, dtype=float)
+
+        differences = point[..., None] - np.array(self.__x, dtype=float)
+        exact = differences == 0
+        terms = weights / np.where(exact, 1, differences)
+        polynomial = (terms @ np.array(self.__y, dtype=float)) / terms.sum(axis=-1)
+
+        known = exact.any(axis=-1)
+        if known.any():
+            values = np.array(self.__y, dtype=float)[exact.argmax(axis=-1)]
+            polynomial = np.where(known, values, polynomial)
+
+        return polynomial if polynomial.ndim else float(polynomial)
+
+
+class Chebyshev:
+    """
+    Chebyshev series f(x) = sum(c_k T_k(t)) on [a, b],
+    t = (2x - a - b) / (b - a).
+
+    Callable is sampled at Chebyshev points, the
+    coefficients are got by FFT in O(n log n), and
+    the degree is doubled until the coefficients
+    decay below tolerance, then the tail is chopped.
+
+    >> function = Chebyshev.interpolate(np.exp, (0, 1))
+    >> function(np.linspace(0, 1, 10**6))  # Clenshaw, O(n) per point
+    >> function.derivative()(0.5)
+    >> function.integral()(1)  # integral from 0 to 1
+    >> function.roots()
+    """
+
+    def __init__(self, coefficients: np.ndarray, bounds: Tuple = (-1, 1)) -> None:
+        """
+        :param coefficients: c_0, ..., c_n
+        :param bounds: (a, b), a < b
+        """
+
+        if bounds[0] >= bounds[1]:
+            raise ValueError(
+                f"Left(={bounds[0]}) bound have to be less than right(={bounds[1]})!"
             )
 
-            sep_differences: float = sum(
-                self.__y[j]
-                / reduce(
-                    lambda a, b: a * b,
-                    (self.__x[j] - self.__x[l] for l in range(k + 2) if l != j),
+        self.coefficients: np.ndarray = np.atleast_1d(
+            np.array(coefficients, dtype=float)
+        )
+        self.bounds: Tuple = bounds
+
+    @staticmethod
+    def points(degree: int, bounds: Tuple = (-1, 1)) -> np.ndarray:
+        """
+        Chebyshev points cos(pi k / n), k = 0..n,
+        mapped to [a, b].
+        """
+
+        t = np.cos(np.pi * np.arange(degree + 1) / max(degree, 1))
+        return (bounds[0] + bounds[1]) / 2 + (bounds[1] - bounds[0]) / 2 * t
+
+    @staticmethod
+    def fit(values: np.ndarray) -> np.ndarray:
+        """
+        Coefficients of series, which interpolates
+        values at Chebyshev points: FFT of the values
+        extended to the whole circle (DCT-I).
+        """
+
+        degree = len(values) - 1
+        if not degree:
+            return np.array(values, dtype=float)
+
+        extended = np.concatenate((values, values[-2:0:-1]))
+        coefficients = np.fft.rfft(extended).real[: degree + 1] / degree
+        coefficients[[0, -1]] /= 2
+        return coefficients
+
+    @classmethod
+    def interpolate(
+        cls,
+        function: Callable,
+        bounds: Tuple = (-1, 1),
+        degree: Optional[int] = None,
+        tolerance: float = 1e-14,
+        max_degree: int = 2**16,
+    ) -> "Chebyshev":
+        """
+        Approximation of function on [a, b].
+
+        :param function: f(x), scalar or vectorized
+        :param bounds: (a, b), a < b
+        :param degree: fixed degree, without it degree is chosen
+        :param tolerance: relative size of chopped coefficients
+        :param max_degree: limit of degree for automatic choice
+        :return: Chebyshev
+        """
+
+        function = as_vectorized(function)
+        if degree is not None:
+            return cls(cls.fit(function(cls.points(degree, bounds))), bounds)
+
+        degree = 16
+        while True:
+            coefficients = cls.fit(function(cls.points(degree, bounds)))
+            scale = np.abs(coefficients).max()
+            tail = np.abs(coefficients[-max(degree // 8, 2) :]).max()
+            if tail <= tolerance * scale or degree >= max_degree:
+                break
+            degree *= 2
+
+        significant = np.flatnonzero(np.abs(coefficients) > tolerance * scale)
+        size = significant[-1] + 1 if significant.size else 1
+        return cls(coefficients[:size], bounds)
+
+    @property
+    def degree(self) -> int:
+        return len(self.coefficients) - 1
+
+    def __call__(
+        self, point: Union[int, float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        """
+        Clenshaw recurrence b_k = c_k + 2t b_(k+1) - b_(k+2),
+        f = c_0 + t b_1 - b_2.
+
+        :param point: find function result at point(s)
+        :return: f(point)
+        """
+
+        a, b = self.bounds
+        t = (2 * np.asarray(point, dtype=float) - a - b) / (b - a)
+        current, previous = np.zeros_like(t), np.zeros_like(t)
+
+        for c in self.coefficients[:0:-1]:
+            current, previous = c + 2 * t * current - previous, current
+        result = self.coefficients[0] + t * current - previous
+
+        return result if result.ndim else float(result)
+
+    def derivative(self) -> "Chebyshev":
+        """
+        Series of f', c'_(k-1) = c'_(k+1) + 2k c_k.
+        """
+
+        c, size = self.coefficients, self.degree
+        if not size:
+            return Chebyshev([0.0], self.bounds)
+
+        derivative = np.zeros(size + 2)
+        for k in range(size, 0, -1):
+            derivative[k - 1] = derivative[k + 1] + 2 * k * c[k]
+        derivative[0] /= 2
+
+        scale = 2 / (self.bounds[1] - self.bounds[0])
+        return Chebyshev(derivative[:size] * scale, self.bounds)
+
+    def integral(self) -> "Chebyshev":
+        """
+        Series of F(x) = integral of f from a to x,
+        C_k = (c_(k-1) - c_(k+1)) / 2k.
+        """
+
+        c = np.concatenate((self.coefficients, [0.0, 0.0]))
+        c[0] *= 2
+        k = np.arange(1, len(c) - 1)
+
+        integral = np.zeros(len(c) - 1)
+        integral[1:] = (c[:-2] - c[2:]) / (2 * k)
+        integral[0] = -np.sum(integral[1:] * (-1.0) ** k)
+
+        scale = (self.bounds[1] - self.bounds[0]) / 2
+        return Chebyshev(integral * scale, self.bounds)
+
+    def roots(self, tolerance: float = 1e-8, split: int = 64) -> np.ndarray:
+        """
+        Real roots on [a, b] as eigenvalues of colleague
+        matrix. Series of degree above `split` are
+        divided in halves, which are approximated again.
+
+        :param tolerance: imaginary part and distance out of [a, b]
+        :param split: maximum degree of one colleague matrix
+        :return: sorted array of roots
+        """
+
+        a, b = self.bounds
+        c = self.coefficients
+        significant = np.flatnonzero(np.abs(c) > np.finfo(float).eps * np.abs(c).max())
+        if not significant.size or significant[-1] == 0:
+            return np.array([])
+        c = c[: significant[-1] + 1]
+        size = len(c) - 1
+
+        if size > split:
+            middle = (a + b) / 2 + (b - a) * 2**-7
+            halves = [
+                Chebyshev.interpolate(self, bounds, max_degree=size).roots(
+                    tolerance, split
                 )
-                for j in range(k + 2)
+                for bounds in ((a, middle), (middle, b))
+            ]
+            roots = np.concatenate(halves)
+            if roots.size < 2:
+                return roots
+            return roots[np.append(True, np.diff(roots) > tolerance * (b - a))]
+
+        if size == 1:
+            t = np.array([-c[0] / c[1]])
+        else:
+            colleague = np.diag(np.full(size - 1, 0.5), 1) + np.diag(
+                np.full(size - 1, 0.5), -1
             )
+            colleague[0, 1] = 1
+            colleague[-1] -= c[:-1] / (2 * c[-1])
+            t = np.linalg.eigvals(colleague)
+
+        t = t[(np.abs(t.imag) < tolerance) & (np.abs(t.real) <= 1 + tolerance)].real
+        return np.sort((a + b) / 2 + (b - a) / 2 * np.clip(t, -1, 1))
+
 
-            polynomial += sep_differences * x_values_multiply
+class Piecewise(ABC):
+    """
+    Piecewise polynomial through known points:
+    p_i(x) = sum(c_ik (x - x_i)^k) on [x_i, x_(i+1)].
+    Nodes and coefficients (intervals x powers) are
+    contiguous arrays, interval of every query point
+    is found by binary search (np.searchsorted), so
+    sorted or unsorted arrays are evaluated at once.
+    Points outside of nodes are extrapolated by
+    the first or the last polynomial.
+
+    >> function = CubicSpline(x_values, y_values)
+    >> function(np.random.uniform(0, 1, 10**6))
+
+    Tables of nodes are read by memory map from .npy
+    file with rows (x, y) or columns x, y.
+
+    >> function = Pchip.load("table.npy")
+    """
+
+    def __init__(
+        self,
+        x_values: Union[List[float], np.ndarray],
+        y_values: Union[List[float], np.ndarray],
+    ) -> None:
+        """
+        :param x_values: strictly increasing X values
+        :param y_values: f(X) values
+        """
+
+        if len(y_values) != len(x_values):
+            raise ValueError("Lengths of arrays must be equal!")
+        if len(x_values) < 2:
+            raise ValueError("At least two points are needed!")
+
+        self.x: np.ndarray = np.ascontiguousarray(x_values, dtype=float)
+        self.y: np.ndarray = np.ascontiguousarray(y_values, dtype=float)
+        if not np.all(self.x[1:] > self.x[:-1]):
+            raise ValueError("X values have to be strictly increasing!")
 
-        return polynomial
+        self.coefficients: np.ndarray = np.ascontiguousarray(self._coefficients())
 
-    def lagrange(self, point: Union[int, float]) -> float:
+    @classmethod
+    def load(cls, path: Union[str, PathLike]) -> "Piecewise":
+        """
+        Interpolant of table in .npy file, table of
+        shape (2, n) is not copied (memory map).
+        """
+
+        table = np.load(path, mmap_mode="r")
+        if table.ndim != 2 or 2 not in table.shape:
+            raise ValueError(f"Table of shape {table.shape} isn't (2, n) or (n, 2)!")
+        x_values, y_values = table if table.shape[0] == 2 else table.T
+        return cls(x_values, y_values)
+
+    @abstractmethod
+    def _coefficients(self) -> np.ndarray:
+        """
+        Coefficients c_ik of every interval,
+        (intervals x powers) array.
+        """
+
+    def _slopes(self) -> Tuple[np.ndarray, np.ndarray]:
+        h = np.diff(self.x)
+        return h, np.diff(self.y) / h
+
+    def _hermite(self, derivatives: np.ndarray) -> np.ndarray:
+        """
+        Cubic coefficients by values and derivatives at nodes.
+        """
+
+        h, delta = self._slopes()
+        left, right = derivatives[:-1], derivatives[1:]
+        return np.stack(
+            (
+                self.y[:-1],
+                left,
+                (3 * delta - 2 * left - right) / h,
+                (left + right - 2 * delta) / h**2,
+            ),
+            axis=1,
+        )
+
+    def _intervals(self, points: np.ndarray) -> np.ndarray:
+        """
+        Index of interval of every point. Unsorted
+        queries are sorted first, binary search
+        over sorted queries is much faster.
         """
-        Calculate new point by Lagrange polynomial.
-        Function gets x and returns f(x).
 
-        :param point: find function result at point
+        if np.all(points[1:] >= points[:-1]):
+            index = np.searchsorted(self.x, points, side="right")
+        else:
+            order = np.argsort(points)
+            index = np.empty(len(points), dtype=np.intp)
+            index[order] = np.searchsorted(self.x, points[order], side="right")
+        return np.clip(index - 1, 0, len(self.x) - 2)
+
+    def __call__(
+        self, point: Union[int, float, np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        """
+        :param point: find function result at point(s)
         :return: f(point)
         """
 
-        def phi(index: int) -> float:
-            """
-            Calculate phi function
-            in lagrange polynomial.
+        point = np.asarray(point, dtype=float)
+        index = self._intervals(point.ravel()).reshape(point.shape)
+
+        dx = point - self.x[index]
+        coefficients = self.coefficients[index]
+        result = coefficients[..., -1]
+        for k in range(self.coefficients.shape[1] - 2, -1, -1):
+            result = result * dx + coefficients[..., k]
+
+        return result if result.ndim else float(result)
+
+
+class PiecewiseLinear(Piecewise):
+    """
+    Broken line through known points.
+    """
+
+    def _coefficients(self) -> np.ndarray:
+        return np.stack((self.y[:-1], self._slopes()[1]), axis=1)
+
+
+class Pchip(Piecewise):
+    """
+    Monotone piecewise cubic Hermite interpolant
+    (Fritsch-Carlson): derivatives are weighted
+    harmonic means of slopes, zero at extrema,
+    so monotone data gives monotone function.
+    """
+
+    def _coefficients(self) -> np.ndarray:
+        h, delta = self._slopes()
+        derivatives = np.zeros_like(self.y)
+        if len(h) == 1:
+            derivatives[:] = delta[0]
+            return self._hermite(derivatives)
+
+        w1, w2 = 2 * h[1:] + h[:-1], h[1:] + 2 * h[:-1]
+        same = delta[:-1] * delta[1:] > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:])
+        derivatives[1:-1] = np.where(same, means, 0)
+
+        for end, (h0, h1, d0, d1) in (
+            (0, (h[0], h[1], delta[0], delta[1])),
+            (-1, (h[-1], h[-2], delta[-1], delta[-2])),
+        ):
+            slope = ((2 * h0 + h1) * d0 - h0 * d1) / (h0 + h1)
+            if np.sign(slope) != np.sign(d0):
+                slope = 0
+            elif np.sign(d0) != np.sign(d1) and abs(slope) > abs(3 * d0):
+                slope = 3 * d0
+            derivatives[end] = slope
+
+        return self._hermite(derivatives)
+
+
+def _solve_tridiagonal(
+    lower: np.ndarray, diagonal: np.ndarray, upper: np.ndarray, rhs: np.ndarray
+) -> np.ndarray:
+    """
+    Parallel cyclic reduction: every step eliminates
+    neighbours at distance 1, 2, 4, ... of all rows
+    at once, so log(n) vectorized steps solve the
+    diagonally dominant tridiagonal system.
+
+    :param lower: a_i of a_i x_(i-1), a_0 = 0
+    :param diagonal: b_i of b_i x_i
+    :param upper: c_i of c_i x_(i+1), c_(n-1) = 0
+    :param rhs: d_i
+    :return: x
+    """
+
+    a, b, c, d = (np.array(v, dtype=float) for v in (lower, diagonal, upper, rhs))
+    size, step = len(b), 1
+
+    while step < size:
+
+        def before(v: np.ndarray, fill: float) -> np.ndarray:
+            return np.concatenate((np.full(step, fill), v[:-step]))
+
+        def after(v: np.ndarray, fill: float) -> np.ndarray:
+            return np.concatenate((v[step:], np.full(step, fill)))
+
+        alpha, gamma = -a / before(b, 1), -c / after(b, 1)
+        a, b, c, d = (
+            alpha * before(a, 0),
+            b + alpha * before(c, 0) + gamma * after(a, 0),
+            gamma * after(c, 0),
+            d + alpha * before(d, 0) + gamma * after(d, 0),
+        )
+        step *= 2
+
+    return d / b
+
+
+class CubicSpline(Piecewise):
+    """
+    Natural cubic spline: C2 function with zero
+    second derivative at the ends. Second derivatives
+    at nodes solve tridiagonal system
+    h_(i-1) M_(i-1) + 2(h_(i-1) + h_i) M_i + h_i M_(i+1)
+    = 6 (delta_i - delta_(i-1)).
+    """
+
+    def _coefficients(self) -> np.ndarray:
+        h, delta = self._slopes()
+        moments = np.zeros_like(self.y)
+        if len(h) > 1:
+            lower, upper = np.append(0, h[1:-1]), np.append(h[1:-1], 0)
+            moments[1:-1] = _solve_tridiagonal(
+                lower, 2 * (h[:-1] + h[1:]), upper, 6 * np.diff(delta)
+            )
+
+        left, right = moments[:-1], moments[1:]
+        return np.stack(
+            (
+                self.y[:-1],
+                delta - h * (2 * left + right) / 6,
+                left / 2,
+                (right - left) / (6 * h),
+            ),
+            axis=1,
+        )
+
+
+class InterpolationTestCase(unittest.TestCase):
+    """
+    Tests for interpolation by known points and by callable.
+    """
+
+    def setUp(self) -> None:
+        self.random = np.random.default_rng(3)
+        self.x_values = [-10, -4, 1, 5, 7]
+        self.y_values = [0, 2, -1, -2, 8]
+
+    def test_newton_lagrange(self) -> None:
+        """
+        Test of Newton and Lagrange polynomials against
+        the formula of Lagrange basis polynomials.
+        :return: None
+        """
+
+        def basis(point: float) -> float:
+            return sum(
+                y_i
+                * np.prod(
+                    [(point - x_j) / (x_i - x_j) for x_j in self.x_values if x_j != x_i]
+                )
+                for x_i, y_i in zip(self.x_values, self.y_values)
+            )
+
+        function = Interpolation(self.x_values, self.y_values)
+        points = np.linspace(-12, 9, 43)
+        expected = [basis(point) for point in points]
 
-            :return: result of phi function
-            """
+        np.testing.assert_allclose(function.newton(points), expected, atol=1e-9)
+        np.testing.assert_allclose(function.lagrange(points), expected, atol=1e-9)
+        self.assertAlmostEqual(function.newton(3), basis(3), 9)
+        self.assertEqual(function.lagrange(5), -2)
 
-            return reduce(
-                lambda a, b: a * b,
-                (
-                    (point - x_j) / (self.__x[index] - x_j)
-                    for j, x_j in enumerate(self.__x)
-                    if j != index
-                ),
+    def test_append_remove(self) -> None:
+        """
+        Test of added and removed points against a rebuilt instance.
+        :return: None
+        """
+
+        function = Interpolation(self.x_values, self.y_values)
+        x_values, y_values = list(self.x_values), list(self.y_values)
+        points = np.linspace(-10, 7, 35)
+        function.newton(0)
+        function.lagrange(0)
+
+        for x, y in ((2, 3), (-7, 1), (9, -4)):
+            function.append(x, y)
+            function.remove(0)
+            x_values, y_values = x_values[1:] + [x], y_values[1:] + [y]
+            rebuilt = Interpolation(x_values, y_values)
+
+            np.testing.assert_allclose(function.newton(points), rebuilt.newton(points))
+            np.testing.assert_allclose(
+                function.lagrange(points), rebuilt.lagrange(points), atol=1e-9
             )
 
-        return sum(y_i * phi(i) for i, y_i in enumerate(self.__y))
+        function.append(11, 0)
+        rebuilt = Interpolation(x_values + [11], y_values + [0])
+        np.testing.assert_allclose(function.newton(points), rebuilt.newton(points))
+
+        with self.assertRaises(ValueError):
+            function.append(11, 1)
+
+    def test_chebyshev(self) -> None:
+        """
+        Test of Chebyshev approximation, its derivative and integral.
+        :return: None
+        """
+
+        function = Chebyshev.interpolate(np.exp, (0, 2))
+        points = np.linspace(0, 2, 101)
+
+        np.testing.assert_allclose(function(points), np.exp(points), rtol=1e-14)
+        np.testing.assert_allclose(
+            function.derivative()(points), np.exp(points), rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            function.integral()(points), np.exp(points) - 1, atol=1e-14
+        )
+
+        sine = Chebyshev.interpolate(np.sin, (0, 30))
+        np.testing.assert_allclose(sine.roots(), np.pi * np.arange(10), atol=1e-12)
+
+    def test_chebyshev_roots(self) -> None:
+        """
+        Test of roots of series of degree 1 and 2, and of
+        extremum of quadratic through its derivative.
+        :return: None
+        """
+
+        np.testing.assert_allclose(Chebyshev([0.5, 1.0]).roots(), [-0.5])
+        line = Chebyshev.interpolate(lambda x: x - 0.3, (0, 1))
+        np.testing.assert_allclose(line.roots(), [0.3])
+
+        parabola = Chebyshev.interpolate(lambda x: (x - 0.3) * (x + 0.5))
+        np.testing.assert_allclose(parabola.roots(), [-0.5, 0.3])
+        np.testing.assert_allclose(parabola.derivative().roots(), [-0.1])
+
+        shifted = Chebyshev.interpolate(lambda x: (x - 1.2) ** 2 - 0.25, (0, 2))
+        np.testing.assert_allclose(shifted.roots(), [0.7, 1.7])
+        np.testing.assert_allclose(shifted.derivative().roots(), [1.2])
+
+        positive = Chebyshev.interpolate(lambda x: np.cos(50 * x) + 2)
+        self.assertGreater(positive.degree, 64)
+        self.assertEqual(positive.roots().size, 0)
+
+    def test_piecewise(self) -> None:
+        """
+        Test of piecewise interpolants at nodes and between them,
+        and of nodes loaded from .npy file.
+        :return: None
+        """
+
+        x_values = np.linspace(0, 10, 200) + self.random.uniform(-0.01, 0.01, 200)
+        y_values = np.sin(x_values)
+        points = self.random.uniform(x_values[0], x_values[-1], 1000)
+
+        for kind, tolerance in (
+            (PiecewiseLinear, 1e-3),
+            (Pchip, 1e-3),
+            (CubicSpline, 1e-4),
+        ):
+            function = kind(x_values, y_values)
+            np.testing.assert_allclose(function(x_values), y_values, atol=1e-14)
+            np.testing.assert_allclose(function(points), np.sin(points), atol=tolerance)
+
+        spline = CubicSpline(x_values, y_values)
+        second = 2 * spline.coefficients[:, 2]
+        ends = second[:-1] + 6 * spline.coefficients[:-1, 3] * np.diff(x_values)[:-1]
+        np.testing.assert_allclose(ends, second[1:], atol=1e-9)
+        self.assertEqual(second[0], 0)
+
+        steps = Pchip(np.arange(6.0), [0, 0, 1, 1, 1, 3])
+        self.assertTrue(np.all(np.diff(steps(np.linspace(0, 5, 501))) >= -1e-15))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "table.npy")
+            np.save(path, np.stack((x_values, y_values)))
+            np.testing.assert_allclose(CubicSpline.load(path)(points), spline(points))
+
+        with self.assertRaises(TypeError):
+            Piecewise(x_values, y_values)
+
+    def test_tridiagonal(self) -> None:
+        """
+        Test of parallel cyclic reduction against dense solve.
+        :return: None
+        """
+
+        for size in (1, 2, 7, 100):
+            lower, upper = self.random.uniform(0, 1, (2, size))
+            lower[0], upper[-1] = 0, 0
+            diagonal = lower + upper + 1
+            rhs = self.random.standard_normal(size)
+
+            matrix = np.diag(diagonal) + np.diag(lower[1:], -1) + np.diag(upper[:-1], 1)
+            np.testing.assert_allclose(
+                _solve_tridiagonal(lower, diagonal, upper, rhs),
+                np.linalg.solve(matrix, rhs),
+            )
 
 
 def main() -> None:
@@ -118,8 +815,11 @@ def main() -> None:
     x_set, y_set = [-10, -4, 1, 5, 7], [0, 2, -1, -2, 8]
     function: Interpolation = Interpolation(x_set, y_set)
 
+    dense = np.linspace(x_set[0], x_set[-1], 10**6)
+
     plt.plot(*foo(function.lagrange), "b*", label="Lagrange")
-    plt.plot(*foo(function.newton), "m", label="Newton")
+    plt.plot(dense, function.newton(dense), "m", label="Newton")
+    plt.plot(dense, CubicSpline(x_set, y_set)(dense), "g", label="Cubic spline")
     plt.plot(x_set, y_set, "ro", label="Input points")
     plt.legend()
     plt.show()
@@ -8,75 +8,804 @@ matrix and R - upper triangular matrix.
 https://en.wikipedia.org/wiki/QR_decomposition
 """
 
-from dataclasses import dataclass
-from typing import Union, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from math import copysign, hypot
+from os import PathLike
+from typing import Iterable, Iterator, List, Optional, Union, Tuple
+import unittest
+
 import numpy as np
 
 Matrix = Union[np.array, np.matrix]
 Complex = Union[float, complex]
 
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
 
 @dataclass
 class QR:
     """
-    Named storage for some matrix A = QR
+    Named storage for some matrix A = QR,
+    Q is (m x m). A changed by a row, a column
+    or a rank-one term is refactored in place
+    by Givens rotations in O(m^2) instead of O(m^2 n).
     """
 
     Q: Matrix = None
     R: Matrix = None
 
+    def _rotate(self, i: int, j: int, column: int) -> None:
+        """
+        Givens rotation of rows i, j of R which
+        zeroes R[j, column], Q is rotated back.
+        """
+
+        c, s = _givens(self.R[i, column], self.R[j, column])
+        G = np.array([[c, s], [-s, c]])
+        self.R[[i, j]] = G @ self.R[[i, j]]
+        self.Q[:, [i, j]] = self.Q[:, [i, j]] @ G.T
+        self.R[j, column] = 0
+
+    def update(self, u: np.ndarray, v: np.ndarray) -> None:
+        """
+        Rank-one update: QR of A + u v^T in O(m^2 + mn).
+        w = Q^T u is zeroed from the bottom by rotations,
+        which make R upper Hessenberg, then R + w_0 e_0 v^T
+        is made triangular again.
+        """
+
+        self.Q, self.R = np.array(self.Q, dtype=float), np.array(self.R, dtype=float)
+        height, width = self.R.shape
+        w = self.Q.T @ np.asarray(u, dtype=float)
+
+        for k in reversed(range(height - 1)):
+            c, s = _givens(w[k], w[k + 1])
+            G = np.array([[c, s], [-s, c]])
+            w[k], w[k + 1] = np.hypot(w[k], w[k + 1]), 0
+            self.R[[k, k + 1]] = G @ self.R[[k, k + 1]]
+            self.Q[:, [k, k + 1]] = self.Q[:, [k, k + 1]] @ G.T
+
+        self.R[0] += w[0] * np.asarray(v, dtype=float)
+        for k in range(min(height - 1, width)):
+            self._rotate(k, k + 1, k)
+
+    def insert_row(self, index: int, row: np.ndarray) -> None:
+        """
+        QR of A with `row` inserted before row `index`.
+        """
+
+        height, width = self.R.shape
+        Q = np.zeros((height + 1, height + 1))
+        Q[0, 0], Q[1:, 1:] = 1, self.Q
+        self.Q = np.insert(Q[1:], index, Q[0], axis=0)
+        self.R = np.vstack((np.asarray(row, dtype=float), self.R))
+
+        for k in range(min(height, width)):
+            self._rotate(k, k + 1, k)
+
+    def delete_row(self, index: int) -> None:
+        """
+        QR of A without row `index`: row of Q is
+        rotated to e_0, then first row of R and
+        first column of Q are dropped.
+        """
+
+        self.Q, self.R = np.array(self.Q, dtype=float), np.array(self.R, dtype=float)
+        q = self.Q[index]
+
+        for k in reversed(range(len(q) - 1)):
+            c, s = _givens(q[k], q[k + 1])
+            G = np.array([[c, s], [-s, c]])
+            self.R[[k, k + 1]] = G @ self.R[[k, k + 1]]
+            self.Q[:, [k, k + 1]] = self.Q[:, [k, k + 1]] @ G.T
+
+        self.Q = np.delete(self.Q, index, axis=0)[:, 1:]
+        self.R = self.R[1:]
+
+    def append_column(self, column: np.ndarray) -> None:
+        """
+        QR of [A | column], Q^T column is added to R
+        and zeroed below the diagonal by rotations.
+        """
+
+        self.Q = np.array(self.Q, dtype=float)
+        self.R = np.hstack(
+            (self.R, (self.Q.T @ np.asarray(column, dtype=float))[:, None])
+        )
+        height, width = self.R.shape
 
-def __reshape(A: Matrix, start_pos: int, size: int) -> Matrix:
+        for k in reversed(range(width - 1, height - 1)):
+            self._rotate(k, k + 1, width - 1)
+
+
+@dataclass
+class Householder:
+    """
+    Compact storage of QR decomposition (as in LAPACK):
+    R is the upper triangle of `factors`, Householder
+    vectors v_k (v_k[0] = 1 isn't stored) are below
+    the diagonal, H_k = I - tau_k * v_k * v_k^T and
+    Q = H_0 @ H_1 @ ... Q is built only when asked.
     """
-    Transforms square H_k matrix
-    into square with order=size
 
-    Example: H -> E
+    factors: Matrix
+    tau: np.ndarray
+    _Q: Matrix = field(default=None, repr=False)
+
+    @property
+    def R(self) -> Matrix:
+        return np.triu(self.factors)
+
+    @property
+    def Q(self) -> Matrix:
+        if self._Q is None:
+            self._Q = self.apply_q(np.identity(self.factors.shape[0]))
+        return self._Q
+
+    def reflector(self, k: int) -> np.ndarray:
+        v = np.copy(self.factors[k:, k])
+        v[0] = 1
+        return v
+
+    def apply_q(self, B: Matrix) -> Matrix:
+        """
+        Q @ B without building Q, B is overwritten.
+        """
 
-    H = [[1, 2],
-         [2, 3]]
+        for k in reversed(range(len(self.tau))):
+            v = self.reflector(k)
+            B[k:] -= self.tau[k] * np.outer(v, v @ B[k:])
+        return B
 
-    E = [[1, 0, 0],
-         [0, 1, 2],
-         [0, 2, 3]]
+    def apply_qt(self, B: Matrix) -> Matrix:
+        """
+        Q.T @ B without building Q, B is overwritten.
+        """
+
+        for k in range(len(self.tau)):
+            v = self.reflector(k)
+            B[k:] -= self.tau[k] * np.outer(v, v @ B[k:])
+        return B
+
+
+def _givens(a: float, b: float) -> Tuple[float, float]:
+    """
+    Givens rotation [[c, s], [-s, c]], which
+    maps (a, b) to (r, 0).
     """
-    E = np.identity(size)
-    for i in range(start_pos, size):
-        for j in range(start_pos, size):
-            E[i, j] = A[i - start_pos, j - start_pos]
-    return E
+
+    if b == 0:
+        return 1.0, 0.0
+    r = np.hypot(a, b)
+    return a / r, b / r
+
+
+def _reflect(x: np.ndarray) -> Tuple[float, float]:
+    """
+    Householder reflector of x, such that
+    H @ x = beta * e. x[1:] is overwritten by v[1:].
+
+    :return: (tau, beta)
+    """
+
+    alpha, norm = x[0], np.linalg.norm(x[1:])
+    if norm == 0:
+        return 0.0, alpha
+
+    beta = -np.copysign(np.hypot(alpha, norm), alpha)
+    x[1:] /= alpha - beta
+    return (beta - alpha) / beta, beta
+
+
+def _factor_panel(A: np.ndarray, tau: np.ndarray, start: int, stop: int) -> None:
+    """
+    Householder steps for columns from start to stop,
+    reflectors are applied to these columns only.
+    """
+
+    for k in range(start, stop):
+        tau[k], beta = _reflect(A[k:, k])
+        A[k, k] = 1
+        v = A[k:, k]
+        A[k:, k + 1 : stop] -= tau[k] * np.outer(v, v @ A[k:, k + 1 : stop])
+        A[k, k] = beta
+
+
+def householder_qr(A: Matrix, overwrite: bool = False, block: int = 64) -> Householder:
+    """
+    In-place Householder QR decomposition. Every
+    reflector is applied to the trailing submatrix
+    only and stored in the zeroed part of the column.
+
+    Columns are processed by panels of `block`:
+    reflectors of a panel are accumulated into
+    compact WY form I - V T V^T and the rest of the
+    matrix is updated by matrix products.
+
+    :param A: (m x n) matrix
+    :param overwrite: factor A itself, if it's float ndarray
+    :param block: amount of columns in a panel, width - unblocked
+    :return: Householder
+    """
+
+    A = np.asarray(A, dtype=float) if overwrite else np.array(A, dtype=float)
+    height, width = A.shape
+    size = min(height, width)
+    tau = np.zeros(size)
+
+    for start in range(0, size, block):
+        stop = min(start + block, size)
+        _factor_panel(A, tau, start, stop)
+        if stop == width:
+            break
+
+        V = np.tril(A[start:, start:stop], -1)
+        V[np.diag_indices(stop - start)] = 1
+        T = np.zeros((stop - start, stop - start))
+        for i in range(stop - start):
+            T[:i, i] = -tau[start + i] * T[:i, :i] @ (V[:, :i].T @ V[:, i])
+            T[i, i] = tau[start + i]
+
+        trailing = A[start:, stop:]
+        trailing -= V @ (T.T @ (V.T @ trailing))
+
+    return Householder(A, tau)
+
+
+def _decompose_stack(A: np.ndarray) -> QR:
+    """
+    Householder QR of every matrix of (batch x m x n)
+    stack, each step is vectorized over the batch.
+    """
+
+    R = np.array(A, dtype=float)
+    batch, height, width = R.shape
+    Q = np.tile(np.identity(height), (batch, 1, 1))
+
+    for k in range(min(height - 1, width)):
+        x = R[:, k:, k]
+        alpha, norm = x[:, 0], np.linalg.norm(x[:, 1:], axis=1)
+        beta = -np.copysign(np.hypot(alpha, norm), alpha)
+        reflect = norm > 0
+        tau = np.where(reflect, (beta - alpha) / np.where(reflect, beta, 1), 0)
+        scale = np.where(reflect, 1 / np.where(reflect, alpha - beta, 1), 0)
+
+        v = np.concatenate((np.ones((batch, 1)), x[:, 1:] * scale[:, None]), axis=1)
+        R[:, k:, k:] -= (
+            tau[:, None, None] * v[:, :, None] * (v[:, None, :] @ R[:, k:, k:])
+        )
+        Q[:, :, k:] -= (
+            tau[:, None, None] * (Q[:, :, k:] @ v[:, :, None]) * v[:, None, :]
+        )
+        R[:, k + 1 :, k] = 0
+
+    return QR(Q, R)
 
 
 def decompose_into_qr(A: Matrix) -> QR:
     """
     Algorithm which decompose A into QR,
     equivalent of np.linalg.qr
+
+    Stack of matrices (batch x m x n) is
+    decomposed at once, Q and R are stacks too.
     """
-    height, width = A.shape
-    index = 0
 
-    result = QR()
-    result.Q = np.identity(height)
-    result.R = A
+    if np.ndim(A) == 3:
+        return _decompose_stack(A)
+
+    result = householder_qr(A)
+    return QR(result.Q, result.R)
+
+
+def iter_row_blocks(
+    source: Union[str, PathLike, Matrix, Iterable[Matrix]], block: int = 2**16
+) -> Iterator[np.ndarray]:
+    """
+    Row blocks of a tall matrix. Source is a path
+    to .npy file (read by memory map), an array,
+    or an iterable of blocks. Vectors are columns.
+
+    :param source: path, array or iterable of arrays
+    :param block: amount of rows in a block of array
+    """
+
+    if isinstance(source, (str, PathLike)):
+        source = np.load(source, mmap_mode="r")
+    if isinstance(source, np.ndarray):
+        array = source
+        source = (array[start : start + block] for start in range(0, len(array), block))
+
+    for rows in source:
+        rows = np.asarray(rows)
+        yield rows.reshape(-1, 1) if rows.ndim == 1 else rows
+
+
+def _triangle(A: np.ndarray) -> np.ndarray:
+    """
+    R factor of A, min(m, n) x n.
+    """
+
+    factors = householder_qr(A, overwrite=True).factors
+    return np.triu(factors[: min(factors.shape)])
+
 
-    while index not in A.shape:
-        x = result.R[index:, index]
-        if x.shape[0] == 1:
+def _merge(upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    return _triangle(np.vstack((upper, lower)))
+
+
+def _reduce(triangles: List[np.ndarray], pool: Optional[Executor]) -> np.ndarray:
+    """
+    Merges R factors pairwise by binary tree,
+    merges of one level run concurrently in pool.
+    """
+
+    apply = map if pool is None else pool.map
+    while len(triangles) > 1:
+        merged = list(apply(_merge, triangles[0::2], triangles[1::2]))
+        triangles = merged + triangles[len(merged) * 2 :]
+    return triangles[0]
+
+
+def tsqr(
+    source: Union[str, PathLike, Matrix, Iterable[Matrix]],
+    block: int = 2**16,
+    executor: Union[str, Executor, None] = None,
+    workers: int = 4,
+) -> Matrix:
+    """
+    Tall-skinny QR: R factor of a matrix with many
+    rows, which is read by row blocks. Every block
+    is factored, R factors are merged by binary tree
+    (R of two stacked triangles), so only a few
+    (block x n) arrays are held at once. Q isn't built.
+
+    With executor `workers` blocks are factored
+    concurrently, then their R factors are merged
+    level by level, merges of a level run in parallel.
+
+    >> R = tsqr("A.npy", block=10**5, executor="thread")
+
+    :param source: path to .npy, array or iterable of row blocks
+    :param block: amount of rows in a block of array
+    :param executor: "thread", "process" or instance of Executor
+    :param workers: amount of blocks factored at once
+    :return: upper triangular R (min(m, n) x n), A^T A = R^T R
+    """
+
+    if isinstance(executor, str):
+        with EXECUTORS[executor]() as pool:
+            return tsqr(source, block, pool, workers)
+
+    blocks = iter_row_blocks(source, block)
+    apply = map if executor is None else executor.map
+    if executor is None:
+        workers = 1
+
+    levels: List[Optional[np.ndarray]] = []
+    while True:
+        window = [np.array(rows, dtype=float) for rows in islice(blocks, workers)]
+        if not window:
             break
 
-        e, e[0] = x * 0, 1
+        R = _reduce(list(apply(_triangle, window)), executor)
+        for level, other in enumerate(levels):
+            if other is None:
+                levels[level] = R
+                break
+            R, levels[level] = _merge(other, R), None
+        else:
+            levels.append(R)
 
-        u = x + np.linalg.norm(x) * e
-        u /= np.linalg.norm(u)
+    triangles = [R for R in reversed(levels) if R is not None]
+    if not triangles:
+        raise Exception("Matrix is empty!")
+    return _reduce(triangles, executor)
 
-        H = np.identity(x.shape[0]) - 2 * np.outer(u, u)
-        H = __reshape(H, index, height)
 
-        result.Q = result.Q @ H.T
-        result.R = H @ result.R
-        index += 1
+@dataclass
+class LeastSquares:
+    """
+    Solution of min ||A x - b||, residual is ||A x - b||
+    (for each column of b) and R is the factor of A.
+    """
+
+    solution: Matrix
+    residual: Union[float, np.ndarray]
+    R: Matrix
+
+
+def _back_substitution(R: np.ndarray, B: np.ndarray) -> np.ndarray:
+    X = np.zeros_like(B)
+    for i in reversed(range(R.shape[0])):
+        X[i] = (B[i] - R[i, i + 1 :] @ X[i + 1 :]) / R[i, i]
+    return X
+
+
+def _augment(
+    source: Union[str, PathLike, Matrix, Iterable[Matrix]],
+    target: Union[str, PathLike, Matrix, Iterable[Matrix]],
+    block: int,
+    columns: List[int],
+) -> Iterator[np.ndarray]:
+    """
+    Row blocks of [A | b], amount of columns
+    of b is written into `columns`. Rows of b
+    are re-chunked to the blocks of A.
+    """
+
+    targets = iter_row_blocks(target, block)
+    rest = np.empty((0, 0))
+
+    for A in iter_row_blocks(source, block):
+        parts, needed = [], len(A)
+        while needed:
+            if not len(rest):
+                rest = next(targets, None)
+                if rest is None:
+                    raise Exception("Target b has less rows than A!")
+                continue
+            parts.append(rest[:needed])
+            needed, rest = needed - len(parts[-1]), rest[len(parts[-1]) :]
+
+        if parts:
+            b = np.vstack(parts)
+            columns[:] = [b.shape[1]]
+            yield np.hstack((A, b))
+
+    if len(rest) or any(len(b) for b in targets):
+        raise Exception("Target b has more rows than A!")
+
+
+def lstsq(
+    source: Union[str, PathLike, Matrix, Iterable[Matrix]],
+    target: Union[str, PathLike, Matrix, Iterable[Matrix], None] = None,
+    block: int = 2**16,
+    executor: Union[str, Executor, None] = None,
+    workers: int = 4,
+) -> LeastSquares:
+    """
+    Least squares by TSQR of augmented matrix [A | b]:
+    its R factor is [[R, Q^T b], [0, S]], so x solves
+    R x = Q^T b and columns of S give the residuals.
+
+    >> lstsq("A.npy", "b.npy", block=10**5).solution
+
+    :param source: rows of A, as in tsqr
+    :param target: rows of b, without it the last
+                   column of source is b
+    :param block: amount of rows in a block of array
+    :param executor: "thread", "process" or instance of Executor
+    :param workers: amount of blocks factored at once
+    :return: LeastSquares
+    """
+
+    if isinstance(target, (str, PathLike)):
+        target = np.load(target, mmap_mode="r")
+
+    columns = [1]
+    if target is None:
+        rows = iter_row_blocks(source, block)
+    else:
+        rows = _augment(source, target, block, columns)
+
+    augmented = tsqr(rows, block, executor, workers)
+    width = augmented.shape[1] - columns[0]
+    if augmented.shape[0] < width:
+        raise Exception("Matrix has less rows than columns!")
+
+    R, z = augmented[:width, :width], augmented[:width, width:]
+    diagonal = np.abs(np.diag(R))
+    if diagonal.min() <= np.finfo(float).eps * width * diagonal.max():
+        raise np.linalg.LinAlgError("Matrix is rank deficient!")
+
+    solution = _back_substitution(R, z)
+    residual = np.linalg.norm(augmented[width:, width:], axis=0)
+    if target is None or (isinstance(target, np.ndarray) and target.ndim == 1):
+        return LeastSquares(solution[:, 0], residual[0], R)
+    return LeastSquares(solution, residual, R)
+
+
+def hessenberg(A: Matrix) -> Matrix:
+    """
+    Reduces square matrix A to upper Hessenberg form
+    H = Q^T A Q (zeros below the first subdiagonal)
+    by Householder reflectors, eigenvalues are kept.
+    """
 
-    return result
+    H = np.array(A, dtype=float)
+    for k in range(H.shape[0] - 2):
+        x = np.copy(H[k + 1 :, k])
+        tau, beta = _reflect(x)
+        if not tau:
+            continue
+
+        v = np.concatenate(([1.0], x[1:]))
+        H[k + 1 :, k + 1 :] -= tau * np.outer(v, v @ H[k + 1 :, k + 1 :])
+        H[:, k + 1 :] -= tau * np.outer(H[:, k + 1 :] @ v, v)
+        H[k + 1, k], H[k + 2 :, k] = beta, 0
+    return H
+
+
+def tridiagonalize(
+    A: Matrix, vectors: bool = True
+) -> Tuple[np.ndarray, np.ndarray, Optional[Matrix]]:
+    """
+    Reduces symmetric matrix A to tridiagonal form
+    T = Q^T A Q by Householder reflectors, every
+    reflector updates the trailing block as a
+    symmetric rank-two update.
+
+    :param vectors: accumulate Q, None otherwise
+    :return: (diagonal, subdiagonal, Q) of T
+    """
+
+    A = np.array(A, dtype=float)
+    size = A.shape[0]
+    reflectors = []
+
+    for k in range(size - 2):
+        x = np.copy(A[k + 1 :, k])
+        tau, beta = _reflect(x)
+        v = np.concatenate(([1.0], x[1:]))
+        if vectors:
+            reflectors.append((tau, v))
+        if not tau:
+            continue
+
+        p = tau * A[k + 1 :, k + 1 :] @ v
+        w = p - tau / 2 * (p @ v) * v
+        A[k + 1 :, k + 1 :] -= np.outer(v, w) + np.outer(w, v)
+        A[k + 1, k] = beta
+
+    Q = np.identity(size) if vectors else None
+    for k, (tau, v) in reversed(list(enumerate(reflectors))):
+        Q[k + 1 :, k + 1 :] -= tau * np.outer(v, v @ Q[k + 1 :, k + 1 :])
+
+    return np.diag(A).copy(), np.diag(A, -1).copy(), Q
+
+
+def _tridiagonal_ql(
+    d: np.ndarray, e: np.ndarray, Z: Optional[np.ndarray], iterations: int
+) -> None:
+    """
+    Implicit QL algorithm with Wilkinson-like shifts
+    on tridiagonal matrix, d is overwritten by
+    eigenvalues, columns of Z are rotated into
+    eigenvectors (if Z is given).
+    """
+
+    size, values = len(d), d.tolist()
+    off = e.tolist() + [0.0]
+    eps = np.finfo(float).eps
+
+    for low in range(size):
+        for _ in range(iterations):
+            m = low
+            while m < size - 1 and abs(off[m]) > eps * (
+                abs(values[m]) + abs(values[m + 1])
+            ):
+                m += 1
+            if m == low:
+                break
+
+            g = (values[low + 1] - values[low]) / (2 * off[low])
+            g = values[m] - values[low] + off[low] / (g + copysign(hypot(g, 1), g))
+            s, c, p = 1.0, 1.0, 0.0
+
+            for i in reversed(range(low, m)):
+                f, b = s * off[i], c * off[i]
+                r = off[i + 1] = hypot(f, g)
+                if r == 0:
+                    values[i + 1] -= p
+                    off[m] = 0.0
+                    break
+
+                s, c = f / r, g / r
+                g = values[i + 1] - p
+                r = (values[i] - g) * s + 2 * c * b
+                p = s * r
+                values[i + 1], g = g + p, c * r - b
+                if Z is not None:
+                    z = np.copy(Z[:, i + 1])
+                    Z[:, i + 1] = s * Z[:, i] + c * z
+                    Z[:, i] = c * Z[:, i] - s * z
+            else:
+                values[low] -= p
+                off[low], off[m] = g, 0.0
+        else:
+            raise Exception(f"Eigenvalue {low} didn't converge in {iterations} steps!")
+
+    d[:] = values
+
+
+@dataclass
+class Eigen:
+    """
+    Eigenvalues of symmetric matrix in ascending
+    order (with multiplicities) and eigenvectors
+    as columns, A = V diag(values) V^T.
+    """
+
+    values: np.ndarray
+    vectors: Matrix = None
+
+
+def symmetric_eigen(A: Matrix, vectors: bool = False, iterations: int = 30) -> Eigen:
+    """
+    Eigenvalues (and eigenvectors) of symmetric
+    matrix A: tridiagonalization and implicit QL
+    steps on the tridiagonal, O(n^3) with vectors,
+    O(n^2) after the reduction without them.
+
+    :param A: symmetric (n x n) matrix
+    :param vectors: accumulate eigenvectors
+    :param iterations: maximum amount of steps per eigenvalue
+    :return: Eigen
+    """
+
+    height, width = np.shape(A)
+    if height != width:
+        raise Exception("Matrix isn't square!")
+
+    d, e, Q = tridiagonalize(A, vectors)
+    if vectors:
+        Q = np.asfortranarray(Q)
+    _tridiagonal_ql(d, e, Q, iterations)
+    order = np.argsort(d)
+    return Eigen(d[order], Q[:, order] if vectors else None)
+
+
+def _apply_reflector(
+    H: np.ndarray, x: np.ndarray, rows: slice, columns: slice, k: int
+) -> None:
+    """
+    Reflector of x applied to H from both sides:
+    to rows k.. of `columns` and to columns k.. of `rows`.
+    """
+
+    tau, _ = _reflect(x)
+    if not tau:
+        return
+    v = np.concatenate(([1.0], x[1:]))
+    size = len(v)
+    H[k : k + size, columns] -= tau * np.outer(v, v @ H[k : k + size, columns])
+    H[rows, k : k + size] -= tau * np.outer(H[rows, k : k + size] @ v, v)
+
+
+def francis(H: Matrix, iterations: int = 3000) -> Matrix:
+    """
+    Francis double-shift QR algorithm on upper
+    Hessenberg matrix. Every step chases a bulge
+    made by two shifts (eigenvalues of the trailing
+    2 x 2 block) in O(n^2), converged 1 x 1 and 2 x 2
+    blocks are deflated and their subdiagonal is zeroed.
+
+    :param H: upper Hessenberg matrix
+    :param iterations: maximum amount of steps
+    :return: quasi-triangular (real Schur) matrix
+    """
+
+    H = np.array(H, dtype=float)
+    eps = np.finfo(float).eps
+    hi, stalled = H.shape[0] - 1, 0
+
+    while hi > 0 and iterations > 0:
+        lo = hi
+        while lo > 0 and abs(H[lo, lo - 1]) >= eps * (
+            abs(H[lo - 1, lo - 1]) + abs(H[lo, lo])
+        ):
+            lo -= 1
+        if lo > 0:
+            H[lo, lo - 1] = 0
+
+        if lo >= hi - 1:
+            hi, stalled = lo - 1, 0
+            continue
+
+        iterations, stalled = iterations - 1, stalled + 1
+        if stalled % 10:
+            s = H[hi - 1, hi - 1] + H[hi, hi]
+            t = H[hi - 1, hi - 1] * H[hi, hi] - H[hi - 1, hi] * H[hi, hi - 1]
+        else:
+            w = abs(H[hi, hi - 1]) + abs(H[hi - 1, hi - 2])
+            s, t = 1.5 * w, w * w
+
+        x = H[lo, lo] ** 2 + H[lo, lo + 1] * H[lo + 1, lo] - s * H[lo, lo] + t
+        y = H[lo + 1, lo] * (H[lo, lo] + H[lo + 1, lo + 1] - s)
+        z = H[lo + 1, lo] * H[lo + 2, lo + 1]
+
+        for k in range(lo, hi - 1):
+            columns = slice(max(lo, k - 1), None)
+            rows = slice(0, min(k + 3, hi) + 1)
+            _apply_reflector(H, np.array([x, y, z]), rows, columns, k)
+            x, y = H[k + 1, k], H[k + 2, k]
+            if k < hi - 2:
+                z = H[k + 3, k]
+        _apply_reflector(
+            H, np.array([x, y]), slice(0, hi + 1), slice(hi - 2, None), hi - 1
+        )
+
+    return H
+
+
+def _deflate(A: np.ndarray, hi: np.ndarray, tolerance: np.ndarray) -> np.ndarray:
+    """
+    Moves bottom of active window of every matrix
+    above converged 1 x 1 and 2 x 2 blocks. Block
+    is converged when its rows to the left of it are
+    not above tolerance of the matrix, these entries
+    are zeroed.
+    """
+
+    columns = np.arange(A.shape[-1])
+    while True:
+        rows = np.flatnonzero(hi > 0)
+        h = hi[rows]
+        left = columns < h[:, None]
+        bound = tolerance[rows]
+        lower = np.where(left, np.abs(A[rows, h]), 0).max(axis=-1) <= bound
+        upper = np.where(left & (columns < h[:, None] - 1), np.abs(A[rows, h - 1]), 0)
+        upper = (h > 1) & ~lower & (upper.max(axis=-1) <= bound)
+
+        for block, size in ((lower, 1), (upper, 2)):
+            for row in range(size):
+                A[rows[block], h[block] - row] *= ~left[block] | (
+                    columns >= h[block, None] - size + 1
+                )
+            hi[rows[block]] -= size
+        if not (lower.any() or upper.any()):
+            return hi
+
+
+def _francis_stack(A: np.ndarray, iterations: int = 3000) -> np.ndarray:
+    """
+    Double-shift QR algorithm for a stack of matrices.
+    Every step is explicit: QR of (A - s1 I)(A - s2 I),
+    s1, s2 are eigenvalues of the trailing 2 x 2 block
+    of active window, and A = Q^T A Q. Matrices whose
+    window shrank to 2 x 2 leave the active set, every
+    tenth step without deflation uses exceptional shift.
+    Rows are negligible below eps * ||A||_F of their
+    matrix, the norm isn't changed by the steps.
+
+    :param A: (batch x n x n) stack
+    :param iterations: maximum amount of steps
+    :return: stack of quasi-triangular matrices
+    """
+
+    _A = np.array(A, dtype=float)
+    batch, size, _ = _A.shape
+    identity = np.identity(size)
+    tolerance = np.finfo(float).eps * np.linalg.norm(_A, axis=(1, 2))
+    hi = _deflate(_A, np.full(batch, size - 1), tolerance)
+    stalled = np.zeros(batch, dtype=int)
+
+    for _ in range(iterations):
+        active = np.flatnonzero(hi > 1)
+        if not active.size:
+            break
+
+        B, h, index = _A[active], hi[active], np.arange(len(active))
+        a, b = B[index, h - 1, h - 1], B[index, h - 1, h]
+        c, d = B[index, h, h - 1], B[index, h, h]
+        s, t = a + d, a * d - b * c
+
+        stalled[active] += 1
+        exceptional = stalled[active] % 10 == 0
+        w = np.abs(c) + np.abs(B[index, h - 1, h - 2])
+        s = np.where(exceptional, 1.5 * w, s)[:, None, None]
+        t = np.where(exceptional, w * w, t)[:, None, None]
+
+        Q = decompose_into_qr(B @ B - s * B + t * identity).Q
+        B = np.swapaxes(Q, 1, 2) @ B @ Q
+        hi[active] = _deflate(B, np.copy(h), tolerance[active])
+        stalled[active[hi[active] < h]] = 0
+        _A[active] = B
+
+    return _A
 
 
 def __process_matrix(A: Matrix, e: float = 1e-6) -> Tuple[Complex, ...]:
@@ -84,43 +813,85 @@ def __process_matrix(A: Matrix, e: float = 1e-6) -> Tuple[Complex, ...]:
     Returns non-multiplies real numbers,
     complex conjugate numbers, and real
     roots of multiplicity 2.
+
+    With e=0 only exactly zero subdiagonal
+    splits blocks, every other 2 x 2 block is solved.
     """
     eigenvalues = set()
     index = 0
     while index < A.shape[0] - 1:
-        if A[index + 1][index] < e:
-            eigenvalues.add(A[index][index])
+        if A[index + 1, index] == 0 or abs(A[index + 1, index]) < e:
+            eigenvalues.add(A[index, index])
             index += 1
         else:
             i = index
             a, b = A[i, i], A[i, i + 1]
             c, d = A[i + 1, i], A[i + 1, i + 1]
-            roots = np.roots([1, -a - d, a * d - b * c])
-            for root in roots:
-                eigenvalues.add(root)
+            mean, discriminant = (a + d) / 2, ((a - d) / 2) ** 2 + b * c
+            root = np.sqrt(discriminant if discriminant >= 0 else complex(discriminant))
+            eigenvalues.add(mean + root)
+            eigenvalues.add(mean - root)
             index += 2
     else:
         if index == A.shape[0] - 1:
-            eigenvalues.add(A[index][index])
+            eigenvalues.add(A[index, index])
 
     return tuple(eigenvalues)
 
 
+def _is_symmetric(A: Matrix) -> bool:
+    """
+    A equals A^T up to rounding, relative to the
+    largest entry of A (no absolute tolerance).
+    """
+
+    A = np.asarray(A, dtype=float)
+    scale = np.abs(A).max(initial=0)
+    return np.allclose(A, A.T, rtol=0, atol=A.shape[0] * np.finfo(float).eps * scale)
+
+
 def find_eigenvalues(
-    A: Matrix, e: float = 1e-6, iterations: int = 3000
-) -> Tuple[Complex, ...]:
+    A: Matrix, e: float = 1e-6, iterations: int = 3000, shifted: bool = True
+) -> Union[Tuple[Complex, ...], List[Tuple[Complex, ...]]]:
     """
     Finds the eigenvalues of a square matrix A with
     accuracy "e" and does ~n iterations to
     find it using QR decomposition.
 
+    By default A is reduced to Hessenberg form and
+    Francis double-shift steps with deflation are
+    done, shifted=False runs unshifted QR algorithm.
+
+    Stack of matrices (batch x n x n) is processed
+    at once by _francis_stack, list of tuples is returned.
+
+    Shifted paths deflate relative to the scale of
+    A, "e" is used only by the unshifted one.
+
+    Both shifted paths zero the subdiagonal of
+    deflated blocks exactly, so every remaining
+    2 x 2 block is solved, not only complex ones.
+
+    Symmetric A is solved by symmetric_eigen, its
+    eigenvalues are sorted and keep multiplicities.
+
     After that, __process the matrix to take
     the necessary values.
     """
-    height, width = A.shape
+    height, width = A.shape[-2:]
     if height != width:
         raise Exception("Matrix isn't square!")
 
+    if np.ndim(A) == 3:
+        _A = _francis_stack(A, iterations)
+        return [__process_matrix(matrix, 0) for matrix in _A]
+
+    if shifted and _is_symmetric(A):
+        return tuple(symmetric_eigen(A, iterations=iterations).values)
+
+    if shifted:
+        return __process_matrix(francis(hessenberg(A), iterations), 0)
+
     _A, _B = np.copy(A), np.copy(A)
     difference, index = np.inf, 0
 
@@ -135,6 +906,224 @@ def find_eigenvalues(
     return __process_matrix(_A, e)
 
 
+def _sorted_eigenvalues(eigenvalues: Tuple[Complex, ...]) -> np.ndarray:
+    return np.sort_complex(np.array(eigenvalues, dtype=complex))
+
+
+class QRTestCase(unittest.TestCase):
+    """
+    Tests for QR decomposition, its updates and eigenvalues.
+    """
+
+    def setUp(self) -> None:
+        self.random = np.random.default_rng(7)
+
+    def assertOrthogonal(self, Q: Matrix) -> None:
+        np.testing.assert_allclose(
+            np.swapaxes(Q, -1, -2) @ Q,
+            np.broadcast_to(np.identity(Q.shape[-1]), Q.shape),
+            atol=1e-12,
+        )
+
+    def test_decompose(self) -> None:
+        """
+        Test of Q @ R reconstruction of tall, wide and
+        blocked factorizations, and of Q applied implicitly.
+        :return: None
+        """
+
+        for shape in ((6, 6), (9, 4), (4, 9)):
+            A = self.random.standard_normal(shape)
+            result = decompose_into_qr(A)
+            self.assertOrthogonal(result.Q)
+            np.testing.assert_allclose(result.Q @ result.R, A, atol=1e-12)
+            np.testing.assert_allclose(np.tril(result.R, -1), 0, atol=1e-15)
+
+        A = self.random.standard_normal((50, 30))
+        blocked, unblocked = householder_qr(A, block=8), householder_qr(A, block=30)
+        np.testing.assert_allclose(blocked.factors, unblocked.factors, atol=1e-12)
+        np.testing.assert_allclose(blocked.Q @ blocked.R, A, atol=1e-12)
+
+        B = self.random.standard_normal((50, 3))
+        np.testing.assert_allclose(
+            blocked.apply_q(np.copy(B)), blocked.Q @ B, atol=1e-12
+        )
+        np.testing.assert_allclose(
+            blocked.apply_qt(np.copy(B)), blocked.Q.T @ B, atol=1e-12
+        )
+
+    def test_decompose_stack(self) -> None:
+        """
+        Test of QR decomposition of a stack of matrices.
+        :return: None
+        """
+
+        A = self.random.standard_normal((20, 5, 4))
+        result = decompose_into_qr(A)
+        self.assertOrthogonal(result.Q)
+        np.testing.assert_allclose(result.Q @ result.R, A, atol=1e-12)
+        np.testing.assert_allclose(np.tril(result.R, -1), 0, atol=1e-15)
+
+    def test_eigenvalues(self) -> None:
+        """
+        Test of shifted, unshifted and symmetric eigenvalues
+        against np.linalg.eigvals.
+        :return: None
+        """
+
+        matrices = list(self.random.standard_normal((50, 8, 8)))
+        matrices.append(
+            np.array(
+                [
+                    [1, 3, 4, 5, 3],
+                    [2, 1, 9, 3, 4],
+                    [7, 3, 2, 5, 8],
+                    [6, 3, 1, 0, 8],
+                    [1, 4, 2, 6, 9],
+                ],
+                dtype=float,
+            )
+        )
+        matrices.append(1e-9 * np.array([[1.0, 2], [3, 4]]))
+        for A in matrices:
+            np.testing.assert_allclose(
+                _sorted_eigenvalues(find_eigenvalues(A)),
+                _sorted_eigenvalues(np.linalg.eigvals(A)),
+                rtol=1e-10,
+                atol=1e-10 * np.abs(A).max(),
+            )
+
+        A = self.random.standard_normal((4, 4))
+        A = A @ A.T + np.diag([4.0, 3, 2, 1])
+        np.testing.assert_allclose(
+            _sorted_eigenvalues(find_eigenvalues(A, e=1e-12, shifted=False)),
+            _sorted_eigenvalues(np.linalg.eigvals(A)),
+            rtol=1e-8,
+        )
+
+    def test_eigenvalues_stack(self) -> None:
+        """
+        Test of eigenvalues of a stack of matrices.
+        :return: None
+        """
+
+        A = self.random.standard_normal((200, 5, 5))
+        A[100:] += np.swapaxes(A[100:], 1, 2)
+        for eigenvalues, reference in zip(
+            find_eigenvalues(A, e=1e-10), np.linalg.eigvals(A)
+        ):
+            np.testing.assert_allclose(
+                _sorted_eigenvalues(eigenvalues),
+                _sorted_eigenvalues(reference),
+                atol=1e-6,
+            )
+
+        B = self.random.standard_normal((100, 6, 6)) * 1e-4
+        for matrices in (A, B):
+            for eigenvalues, reference in zip(
+                find_eigenvalues(matrices), np.linalg.eigvals(matrices)
+            ):
+                np.testing.assert_allclose(
+                    _sorted_eigenvalues(eigenvalues),
+                    _sorted_eigenvalues(reference),
+                    rtol=1e-8,
+                    atol=1e-12 * np.abs(reference).max(),
+                )
+
+    def test_symmetric_eigen(self) -> None:
+        """
+        Test of symmetric eigenvalues with multiplicities
+        and of eigenvectors.
+        :return: None
+        """
+
+        V = decompose_into_qr(self.random.standard_normal((6, 6))).Q
+        A = V @ np.diag([5.0, 1, 2, 1, 2, 1]) @ V.T
+        A = (A + A.T) / 2
+        np.testing.assert_allclose(find_eigenvalues(A), [1, 1, 1, 2, 2, 5], atol=1e-12)
+
+        X = self.random.standard_normal((30, 30))
+        A = X + X.T
+        result = symmetric_eigen(A, vectors=True)
+        np.testing.assert_allclose(result.values, np.linalg.eigvalsh(A), atol=1e-12)
+        self.assertOrthogonal(result.vectors)
+        np.testing.assert_allclose(
+            A @ result.vectors, result.vectors * result.values, atol=1e-12
+        )
+        self.assertIsNone(symmetric_eigen(A).vectors)
+
+        d, e, Q = tridiagonalize(A)
+        self.assertOrthogonal(Q)
+        T = np.diag(d) + np.diag(e, -1) + np.diag(e, 1)
+        np.testing.assert_allclose(Q.T @ A @ Q, T, atol=1e-12)
+        values, subdiagonal, none = tridiagonalize(A, vectors=False)
+        self.assertIsNone(none)
+        np.testing.assert_array_equal(values, d)
+        np.testing.assert_array_equal(subdiagonal, e)
+
+    def test_updates(self) -> None:
+        """
+        Test of rank-one update, row insert/delete and column
+        append against the changed matrix.
+        :return: None
+        """
+
+        A = self.random.standard_normal((8, 5))
+        result = decompose_into_qr(A)
+
+        def check(A: Matrix) -> None:
+            self.assertOrthogonal(result.Q)
+            np.testing.assert_allclose(result.Q @ result.R, A, atol=1e-12)
+            np.testing.assert_allclose(np.tril(result.R, -1), 0, atol=1e-15)
+
+        u, v = self.random.standard_normal(8), self.random.standard_normal(5)
+        result.update(u, v)
+        A = A + np.outer(u, v)
+        check(A)
+
+        row = self.random.standard_normal(5)
+        result.insert_row(3, row)
+        A = np.insert(A, 3, row, axis=0)
+        check(A)
+
+        result.delete_row(3)
+        A = np.delete(A, 3, axis=0)
+        check(A)
+
+        result.delete_row(0)
+        A = A[1:]
+        check(A)
+
+        column = self.random.standard_normal(7)
+        result.append_column(column)
+        check(np.column_stack((A, column)))
+
+    def test_lstsq(self) -> None:
+        """
+        Test of TSQR and least squares by blocks
+        against np.linalg.
+        :return: None
+        """
+
+        A = self.random.standard_normal((1000, 6))
+        b = self.random.standard_normal(1000)
+
+        R = tsqr(A, block=64)
+        np.testing.assert_allclose(R.T @ R, A.T @ A, atol=1e-10)
+
+        solution, residual = np.linalg.lstsq(A, b, rcond=None)[:2]
+        for result in (
+            lstsq(A, b, block=100),
+            lstsq(iter(np.split(A, 8)), b, block=300, executor="thread"),
+            lstsq(np.column_stack((A, b)), block=128),
+        ):
+            np.testing.assert_allclose(result.solution, solution, atol=1e-12)
+            self.assertAlmostEqual(result.residual**2, residual[0], 8)
+
+        with self.assertRaises(Exception):
+            lstsq(A, b[:-1], block=100)
+
+
 if __name__ == "__main__":
     my_matrix = np.matrix(
         [
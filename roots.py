@@ -7,26 +7,98 @@ f1(x0, x1, ..., xn) = 0,
 fn(x0, x1, ..., xn) = 0.
 """
 
-from typing import Dict, Union
+from typing import Callable, Dict, NamedTuple, Sequence, Tuple, Union
 from collections import namedtuple
+from functools import lru_cache
 import unittest
 
+import numpy as np
 import sympy
 
 
+class System(NamedTuple):
+    """
+    System of equations compiled into numpy
+    functions of x with shape (..., n):
+    funcs(x) -> (..., m), jacobi(x) -> (..., m, n).
+    Values of parameters follow variables in x.
+    """
+
+    funcs: Callable
+    jacobi: Callable
+
+
+def _stack(entries: Sequence, x: np.ndarray) -> np.ndarray:
+    """
+    Stack results of lambdified expressions along
+    the last axis, constants get the shape of x.
+    """
+
+    return np.stack(np.broadcast_arrays(x[..., 0], *entries)[1:], axis=-1).astype(float)
+
+
+@lru_cache(maxsize=32)
+def compile_system(
+    variables: Tuple[sympy.Symbol, ...],
+    funcs: Tuple[sympy.Expr, ...],
+    parameters: Tuple[sympy.Symbol, ...] = (),
+) -> System:
+    """
+    Differentiate system once and lambdify functions
+    and Jacobian with common subexpression elimination.
+    Cached, so repeated solves skip sympy work.
+
+    :param variables: Names of variables in sympy format;
+    :param funcs: System of equations in sympy format;
+    :param parameters: Names of parameters in sympy format;
+    :return: System of numpy callables;
+    """
+
+    arguments = variables + parameters
+    jacobi = sympy.Matrix(funcs).jacobian(variables)
+    funcs_numeric = sympy.lambdify(arguments, list(funcs), "numpy", cse=True)
+    jacobi_numeric = sympy.lambdify(arguments, list(jacobi), "numpy", cse=True)
+
+    def compiled_funcs(x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        return _stack(funcs_numeric(*np.moveaxis(x, -1, 0)), x)
+
+    def compiled_jacobi(x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        values = _stack(jacobi_numeric(*np.moveaxis(x, -1, 0)), x)
+        return values.reshape(values.shape[:-1] + jacobi.shape)
+
+    return System(compiled_funcs, compiled_jacobi)
+
+
+def _decimals(epsilon: float) -> int:
+    """
+    Amount of decimal places in epsilon, 1e-08 -> 8.
+    """
+
+    return int(str(epsilon).replace(".", "-").split("-")[1])
+
+
 def newton(
     variables: sympy.symbols,
     funcs: sympy.sympify,
     start_value: Union[int, float] = 0.5,
     epsilon: float = 1e-12,
+    mode: str = "symbolic",
+    iterations: int = 100,
 ) -> Dict[sympy.Symbol, sympy.Float]:
-
     """
     Newton's Method is an iterative method that computes
     an approximate solution to the system of equations.
 
     P.S. read sympy documentation.
 
+    In "numeric" mode functions and Jacobian are
+    compiled into numpy once (see compile_system)
+    and every iteration solves J(x) dx = F(x).
+    ArithmeticError is raised, if it doesn't converge
+    in `iterations` or x stops being finite.
+
     :param variables: Names of variables in sympy format;
     :param funcs: System of equations in sympy format;
     :param start_value: A floating point number or an integer that
@@ -34,19 +106,43 @@ def newton(
                         method, initially it starts with 0.5;
     :param epsilon: Accuracy of approximation of the result
               of the system of equations. Must be more than zero;
+    :param mode: "symbolic" or "numeric";
+    :param iterations: Maximum amount of iterations in numeric mode;
     :return: Dictionary - variable and result of algorithm;
     """
 
     Properties: namedtuple = namedtuple(
         "Properties", ["amount_vars", "amount_func", "accuracy"]
     )
-    _property = Properties(
-        len(variables), len(funcs), int(str(epsilon).replace(".", "-").split("-")[1])
-    )
+    _property = Properties(len(variables), len(funcs), _decimals(epsilon))
 
     if not epsilon or not _property.amount_vars * _property.amount_func:
         raise ValueError
 
+    if mode == "numeric":
+        system = compile_system(tuple(variables), tuple(funcs))
+        x_values = np.full(_property.amount_vars, float(start_value))
+        for _ in range(iterations):
+            funcs_x_values = system.funcs(x_values)
+            jacobi_x_values = system.jacobi(x_values)
+            try:
+                step = np.linalg.solve(jacobi_x_values, funcs_x_values)
+            except np.linalg.LinAlgError:
+                step = np.linalg.lstsq(jacobi_x_values, funcs_x_values, rcond=None)[0]
+            x_values = x_values - step
+
+            if np.all(np.abs(funcs_x_values) < epsilon):
+                return {
+                    var: round(sympy.Float(value), _property.accuracy)
+                    for var, value in zip(variables, x_values)
+                }
+            if not np.all(np.isfinite(x_values)):
+                break
+
+        raise ArithmeticError(
+            f"Newton's method didn't converge in {iterations} iterations!"
+        )
+
     jacobi: sympy.Matrix = sympy.zeros(_property.amount_func, _property.amount_vars)
     for i, func in enumerate(funcs):
         for j, var in enumerate(variables):
@@ -76,6 +172,177 @@ def newton(
     }
 
 
+class Batch(NamedTuple):
+    """
+    Results of batched newton method by rows:
+    solutions (m x n), amount of iterations done
+    (until convergence or non-finite values) and
+    convergence flags (m).
+    """
+
+    solutions: np.ndarray
+    iterations: np.ndarray
+    converged: np.ndarray
+
+
+def newton_batch(
+    variables: sympy.symbols,
+    funcs: sympy.sympify,
+    start_values: np.ndarray,
+    epsilon: float = 1e-12,
+    iterations: int = 100,
+    parameters: Sequence[sympy.Symbol] = (),
+    parameter_values: Union[np.ndarray, None] = None,
+) -> Batch:
+    """
+    Newton's Method for many start points at once.
+    Functions and Jacobian are evaluated for all
+    active rows together, linear systems are solved
+    as one stack. Converged and diverged rows leave
+    the active set.
+
+    :param variables: Names of variables in sympy format;
+    :param funcs: System of equations in sympy format;
+    :param start_values: (m x n) start points;
+    :param epsilon: Accuracy of approximation, max |f_i| < epsilon;
+    :param iterations: Maximum amount of iterations;
+    :param parameters: Names of parameters in sympy format;
+    :param parameter_values: (m x p) values of parameters;
+    :return: Batch of solutions, iterations and convergence flags;
+    """
+
+    if epsilon <= 0 or not len(variables) * len(funcs):
+        raise ValueError
+
+    system = compile_system(tuple(variables), tuple(funcs), tuple(parameters))
+    x_values = np.array(start_values, dtype=float, ndmin=2)
+    rows = x_values.shape[0]
+    params = np.broadcast_to(
+        np.zeros((rows, 0)) if parameter_values is None else parameter_values,
+        (rows, len(parameters)),
+    )
+
+    amount = np.full(rows, iterations)
+    converged = np.zeros(rows, dtype=bool)
+    active = np.arange(rows)
+
+    for index in range(iterations + 1):
+        arguments = np.hstack((x_values[active], params[active]))
+        funcs_x_values = system.funcs(arguments)
+
+        done = np.all(np.abs(funcs_x_values) < epsilon, axis=-1)
+        converged[active[done]], amount[active[done]] = True, index
+        active, arguments = active[~done], arguments[~done]
+        if not active.size or index == iterations:
+            break
+
+        jacobi_x_values = system.jacobi(arguments)
+        try:
+            step = np.linalg.solve(jacobi_x_values, funcs_x_values[~done, :, None])
+        except np.linalg.LinAlgError:
+            step = np.linalg.pinv(jacobi_x_values) @ funcs_x_values[~done, :, None]
+        x_values[active] -= step[..., 0]
+
+        finite = np.all(np.isfinite(x_values[active]), axis=-1)
+        amount[active[~finite]] = index + 1
+        active = active[finite]
+
+    return Batch(x_values, amount, converged)
+
+
+class Report(NamedTuple):
+    """
+    Result of quasi-newton method with amount of
+    iterations, function and Jacobian evaluations.
+    """
+
+    solution: Dict[sympy.Symbol, float]
+    iterations: int
+    evaluations: int
+    jacobians: int
+    converged: bool
+
+
+def broyden(
+    variables: sympy.symbols,
+    funcs: sympy.sympify,
+    start_value: Union[int, float] = 0.5,
+    epsilon: float = 1e-12,
+    iterations: int = 100,
+    refresh: int = 0,
+) -> Report:
+    """
+    Broyden's (quasi-newton) Method. Jacobian is
+    evaluated at the start and then updated by
+    rank-one corrections J += (dF - J dx) dx^T / dx^T dx.
+    Backtracking line search halves the step until
+    |F| decreases; if it fails with an updated Jacobian,
+    the true Jacobian is evaluated again.
+
+    With refresh=k Jacobian is evaluated every k
+    iterations, refresh=1 is newton method with
+    line search - compare evaluations with it.
+
+    :param variables: Names of variables in sympy format;
+    :param funcs: System of equations in sympy format;
+    :param start_value: Initial value of every variable;
+    :param epsilon: Accuracy of approximation, max |f_i| < epsilon;
+    :param iterations: Maximum amount of iterations;
+    :param refresh: Evaluate Jacobian every refresh iterations, 0 - never;
+    :return: Report of solution and evaluations;
+    """
+
+    if epsilon <= 0 or not len(variables) * len(funcs):
+        raise ValueError
+
+    system = compile_system(tuple(variables), tuple(funcs))
+    x_values = np.full(len(variables), float(start_value))
+    funcs_x_values, evaluations = system.funcs(x_values), 1
+    jacobi_x_values, jacobians, fresh = system.jacobi(x_values), 1, True
+
+    index = 0
+    while index < iterations and not np.all(np.abs(funcs_x_values) < epsilon):
+        try:
+            direction = -np.linalg.solve(jacobi_x_values, funcs_x_values)
+        except np.linalg.LinAlgError:
+            direction = -np.linalg.lstsq(jacobi_x_values, funcs_x_values, rcond=None)[0]
+
+        norm, step = np.linalg.norm(funcs_x_values), 1.0
+        for _ in range(30):
+            new_x_values = x_values + step * direction
+            new_funcs_x_values = system.funcs(new_x_values)
+            evaluations += 1
+            if np.linalg.norm(new_funcs_x_values) <= (1 - 1e-4 * step) * norm:
+                break
+            step /= 2
+        else:
+            if not fresh:
+                jacobi_x_values, fresh = system.jacobi(x_values), True
+                jacobians += 1
+                continue
+
+        dx, df = new_x_values - x_values, new_funcs_x_values - funcs_x_values
+        x_values, funcs_x_values = new_x_values, new_funcs_x_values
+        index += 1
+
+        if refresh and not index % refresh:
+            jacobi_x_values, fresh = system.jacobi(x_values), True
+            jacobians += 1
+        elif dx @ dx:
+            jacobi_x_values = jacobi_x_values + np.outer(
+                df - jacobi_x_values @ dx, dx
+            ) / (dx @ dx)
+            fresh = False
+
+    return Report(
+        {var: float(value) for var, value in zip(variables, x_values)},
+        index,
+        evaluations,
+        jacobians,
+        bool(np.all(np.abs(funcs_x_values) < epsilon)),
+    )
+
+
 class NewtonTestCase(unittest.TestCase):
     """
     Tests for newton iterative method.
@@ -99,6 +366,92 @@ class NewtonTestCase(unittest.TestCase):
 
         self.assertDictEqual(function_result, my_result)
 
+    def test_newton_numeric(self) -> None:
+        """
+        Test of compiled numeric newton method.
+        :return: None
+        """
+
+        variables = sympy.symbols(f"x:{2}")
+        funcs = sympy.sympify(["x0**2 + x1**2 - 1", "x0**2 - x1"])
+        symbolic = newton(variables, funcs, epsilon=1e-8)
+        numeric = newton(variables, funcs, epsilon=1e-8, mode="numeric")
+
+        for var in variables:
+            self.assertAlmostEqual(float(numeric[var]), float(symbolic[var]), 7)
+
+        hits = compile_system.cache_info().hits
+        newton(variables, funcs, start_value=0.7, mode="numeric")
+        self.assertEqual(compile_system.cache_info().hits, hits + 1)
+
+        with self.assertRaises(ArithmeticError):
+            newton(variables, sympy.sympify(["x0**2 + 1", "x1 - 1"]), mode="numeric")
+
+    def test_newton_batch(self) -> None:
+        """
+        Test of batched newton method for many start points and parameters.
+        :return: None
+        """
+
+        variables, radius = sympy.symbols(f"x:{2}"), sympy.Symbol("r")
+        funcs = sympy.sympify(["x0**2 + x1**2 - r**2", "x0**2 - x1"])
+        start = np.column_stack((np.linspace(-2, 2, 8), np.full(8, 0.5)))
+        radii = np.linspace(1, 2, 8)[:, None]
+
+        result = newton_batch(
+            variables, funcs, start, 1e-10, parameters=(radius,), parameter_values=radii
+        )
+
+        self.assertTrue(result.converged.all())
+        x0, x1 = result.solutions.T
+        np.testing.assert_allclose(x0**2 + x1**2, radii[:, 0] ** 2, atol=1e-10)
+        np.testing.assert_allclose(x0**2, x1, atol=1e-10)
+        self.assertTrue((result.iterations > 0).all())
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            diverged = newton_batch(
+                sympy.symbols("x:1"), sympy.sympify(["exp(x0) - 1"]), [[800], [1]]
+            )
+        self.assertListEqual(diverged.converged.tolist(), [False, True])
+        self.assertEqual(diverged.iterations[0], 1)
+        self.assertLess(diverged.iterations[1], 100)
+
+    def test_broyden(self) -> None:
+        """
+        Test of broyden method against newton method with line search.
+        :return: None
+        """
+
+        variables = sympy.symbols(f"x:{3}")
+        funcs = sympy.sympify(
+            [
+                "3*x0 - cos(x1*x2) - 1/2",
+                "x0**2 - 81*(x1 + 0.1)**2 + sin(x2) + 1.06",
+                "exp(-x0*x1) + 20*x2 + (10*pi - 3)/3",
+            ]
+        )
+
+        quasi = broyden(variables, funcs, start_value=0.1, epsilon=1e-10)
+        exact = broyden(variables, funcs, start_value=0.1, epsilon=1e-10, refresh=1)
+
+        self.assertTrue(quasi.converged and exact.converged)
+        for var in variables:
+            self.assertAlmostEqual(
+                float(quasi.solution[var]), float(exact.solution[var]), 9
+            )
+        self.assertEqual(exact.jacobians, exact.iterations + 1)
+        self.assertLess(quasi.jacobians, exact.jacobians)
+
+        coarse = broyden(
+            sympy.symbols(f"x:{2}"),
+            sympy.sympify(["x0**2 + x1**2 - 1", "x0**2 - x1"]),
+            epsilon=1e-3,
+        )
+        self.assertTrue(coarse.converged)
+        x0, x1 = coarse.solution.values()
+        self.assertAlmostEqual(x0, 0.78615137, 3)
+        self.assertAlmostEqual(x1, 0.61803399, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
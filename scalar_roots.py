@@ -0,0 +1,234 @@
+"""
+Roots of scalar functions f(x) = 0 on an interval.
+
+Sign changes are found on a grid in one vectorized
+pass, then Brent's method refines every bracket
+simultaneously, so all roots in the interval
+are returned, not just the first one.
+
+https://en.wikipedia.org/wiki/Brent%27s_method
+"""
+
+from typing import Callable, List, Sequence, Tuple, Union
+import unittest
+
+import numpy as np
+
+from integration import as_vectorized
+
+EPS = np.finfo(float).eps
+
+
+def _evaluate(
+    functions: Sequence[Callable], owners: np.ndarray, x: np.ndarray
+) -> np.ndarray:
+    """
+    Evaluate functions[owners[i]] at x[i],
+    every function is called once on its points.
+    """
+
+    values = np.empty_like(x)
+    for index, function in enumerate(functions):
+        mask = owners == index
+        if mask.any():
+            values[mask] = function(x[mask])
+    return values
+
+
+def find_brackets(
+    function: Callable, start: float, stop: float, points: int = 1000
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scan grid of points on [start, stop] and find
+    all intervals where function changes its sign.
+
+    :param function: f(x), called once on the grid
+    :param start: left bound
+    :param stop: right bound
+    :param points: amount of grid points
+    :return: (left, right, zeros) - bounds of brackets
+             and grid points where f(x) == 0
+    """
+
+    if start > stop:
+        raise Exception(f"Left(={start}) bound have to be less than right(={stop})!")
+
+    grid = np.linspace(start, stop, points)
+    values = as_vectorized(function)(grid)
+    change = values[:-1] * values[1:] < 0
+    return grid[:-1][change], grid[1:][change], grid[values == 0]
+
+
+def brent(
+    functions: Union[Callable, Sequence[Callable]],
+    left: np.ndarray,
+    right: np.ndarray,
+    owners: Union[np.ndarray, None] = None,
+    tolerance: float = 1e-12,
+    iterations: int = 100,
+) -> np.ndarray:
+    """
+    Brent's method on many brackets [left, right]
+    at once. Every iteration takes inverse quadratic
+    interpolation, secant or bisection step for each
+    bracket and evaluates all new points together.
+
+    :param functions: f(x) or list of functions
+    :param left: left bounds of brackets, f(left) * f(right) < 0
+    :param right: right bounds of brackets
+    :param owners: index of function of every bracket
+    :param tolerance: absolute accuracy of roots
+    :param iterations: maximum amount of iterations
+    :return: roots, one for every bracket
+    """
+
+    if callable(functions):
+        functions = [functions]
+    functions = [as_vectorized(function) for function in functions]
+
+    a, b = np.array(left, dtype=float), np.array(right, dtype=float)
+    owners = np.zeros(a.shape, dtype=int) if owners is None else np.asarray(owners)
+    fa, fb = _evaluate(functions, owners, a), _evaluate(functions, owners, b)
+    if np.any(fa * fb > 0):
+        raise ValueError("Function must have different signs at bounds of bracket!")
+
+    c, fc = b.copy(), fb.copy()
+    d = e = b - a
+    active = np.ones(a.shape, dtype=bool)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(iterations):
+            reset = np.sign(fb) == np.sign(fc)
+            c, fc = np.where(reset, a, c), np.where(reset, fa, fc)
+            d, e = np.where(reset, b - a, d), np.where(reset, b - a, e)
+
+            swap = np.abs(fc) < np.abs(fb)
+            a, b, c = np.where(swap, b, a), np.where(swap, c, b), np.where(swap, b, c)
+            fa, fb, fc = (
+                np.where(swap, fb, fa),
+                np.where(swap, fc, fb),
+                np.where(swap, fb, fc),
+            )
+
+            tol = 2 * EPS * np.abs(b) + 0.5 * tolerance
+            middle = 0.5 * (c - b)
+            active &= (np.abs(middle) > tol) & (fb != 0)
+            if not active.any():
+                break
+
+            s = fb / fa
+            secant = a == c
+            q, r = fa / fc, fb / fc
+            p = np.where(
+                secant,
+                2 * middle * s,
+                s * (2 * middle * q * (q - r) - (b - a) * (r - 1)),
+            )
+            q = np.where(secant, 1 - s, (q - 1) * (r - 1) * (s - 1))
+            q = np.where(p > 0, -q, q)
+            p = np.abs(p)
+
+            interpolate = (np.abs(e) >= tol) & (np.abs(fa) > np.abs(fb))
+            interpolate &= 2 * p < np.minimum(
+                3 * middle * q - np.abs(tol * q), np.abs(e * q)
+            )
+            e = np.where(interpolate, d, middle)
+            d = np.where(interpolate, p / q, middle)
+
+            a, fa = np.where(active, b, a), np.where(active, fb, fa)
+            step = np.where(np.abs(d) > tol, d, np.copysign(tol, middle))
+            b = np.where(active, b + step, b)
+            fb = np.where(
+                active, _evaluate(functions, np.where(active, owners, -1), b), fb
+            )
+
+    return b
+
+
+def find_roots(
+    functions: Union[Callable, Sequence[Callable]],
+    start: float,
+    stop: float,
+    points: int = 1000,
+    tolerance: float = 1e-12,
+    iterations: int = 100,
+) -> Union[np.ndarray, List[np.ndarray]]:
+    """
+    All roots of function (or every function of a list)
+    on [start, stop]: sign changes on the grid, then
+    Brent's method on all brackets of all functions.
+    Roots closer than grid step may be missed.
+
+    >> find_roots(np.sin, 1, 10)  # [pi, 2 * pi, 3 * pi]
+
+    :param functions: f(x) or list of functions
+    :param start: left bound
+    :param stop: right bound
+    :param points: amount of grid points for every function
+    :param tolerance: absolute accuracy of roots
+    :param iterations: maximum amount of iterations of Brent's method
+    :return: sorted roots, list of them for list of functions
+    """
+
+    single = callable(functions)
+    if single:
+        functions = [functions]
+
+    brackets = [find_brackets(f, start, stop, points) for f in functions]
+    owners = np.concatenate(
+        [np.full(len(left), i) for i, (left, _, _) in enumerate(brackets)]
+    ).astype(int)
+    roots = brent(
+        functions,
+        np.concatenate([left for left, _, _ in brackets]),
+        np.concatenate([right for _, right, _ in brackets]),
+        owners,
+        tolerance,
+        iterations,
+    )
+
+    result = [
+        np.sort(np.concatenate((roots[owners == i], zeros)))
+        for i, (_, _, zeros) in enumerate(brackets)
+    ]
+    return result[0] if single else result
+
+
+class BrentTestCase(unittest.TestCase):
+    """
+    Tests for bracketing and Brent's method.
+    """
+
+    def test_find_roots(self) -> None:
+        """
+        Test of all roots of one function.
+        :return: None
+        """
+
+        np.testing.assert_allclose(
+            find_roots(np.sin, 1, 10), [np.pi, 2 * np.pi, 3 * np.pi], rtol=1e-14
+        )
+        np.testing.assert_allclose(
+            find_roots(lambda x: np.cos(x) - x, -5, 5), [0.7390851332151607]
+        )
+
+    def test_many_functions(self) -> None:
+        """
+        Test of roots of list of functions, scalar-only functions
+        and zeros on grid points.
+        :return: None
+        """
+
+        shifts = np.linspace(0.5, 2, 7)
+        functions = [lambda x, s=s: x**3 - s for s in shifts]
+        roots = find_roots(functions, 0, 2, points=101)
+
+        for root, shift in zip(roots, shifts):
+            np.testing.assert_allclose(root, [shift ** (1 / 3)], atol=1e-12)
+
+        exact = find_roots(lambda x: x * (x - 0.5) if x else 0.0, -1, 1, points=5)
+        np.testing.assert_allclose(exact, [0, 0.5])
+
+
+if __name__ == "__main__":
+    unittest.main()
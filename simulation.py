@@ -1,14 +1,26 @@
 """
 Simulation of the movement of a pneumatic balloon in a gif-format.
+
+Physics is run by `simulate` without drawing, it returns
+the whole trajectory in numpy arrays. Gif is made by
+`render` from the trajectory (matplotlib and celluloid
+are imported only there).
+
+>> trajectory = simulate(_data, _time, _vars)
+>> render(trajectory, _data, _vars, "animation.gif")
+
+Shape of the balloon is solved every frame by Newton's
+method (warm start from the previous frame), or by
+the relaxation with solver="relaxation".
 """
 
-from dataclasses import dataclass
-from typing import NamedTuple
+from dataclasses import dataclass, replace
+from math import cos, pi, sin
+from time import perf_counter
+from typing import NamedTuple, Optional, Tuple
+import unittest
 
-import matplotlib.pyplot as plt
 import numpy as np
-from matplotlib import patches, pyplot
-from celluloid import Camera
 
 
 class PhysicProperties(NamedTuple):
@@ -39,25 +51,247 @@ class Variables:
     C: float
 
 
+class Trajectory(NamedTuple):
+    """
+    State of the balloon after every frame:
+    time, (x1, x2, y, f1, f2), height of the
+    load Ay, its velocity Vy, force, amount of
+    Newton steps and relaxation sweeps, wall time
+    of the solve, and whether Newton converged
+    (without fallback to the relaxation).
+    """
+
+    time: np.ndarray
+    states: np.ndarray
+    height: np.ndarray
+    velocity: np.ndarray
+    force: np.ndarray
+    iterations: np.ndarray
+    relaxations: np.ndarray
+    elapsed: np.ndarray
+    converged: np.ndarray
+
+
+SOLVERS = ("newton", "relaxation")
+DIVERGENCE = 1e3
+BACKTRACKING = 8
+
+
+def _residuals(
+    x1: float, x2: float, y: float, f1: float, f2: float, consts: Tuple[float, ...]
+) -> Tuple[float, ...]:
+    Ax, Bx, Ay, By, C = consts
+    return (
+        x1 + y * cos(3 * pi / 2 - f1) - Ax,
+        x2 + y * cos(3 * pi / 2 + f2) - Bx,
+        y + y * sin(3 * pi / 2 - f1) - Ay,
+        (f1 + f2) * y + (x2 - x1) - C,
+        y + y * sin(3 * pi / 2 + f2) - By,
+    )
+
+
+def _constants(consts: Variables) -> Tuple[float, ...]:
+    return tuple(
+        float(value) for value in (consts.Ax, consts.Bx, consts.Ay, consts.By, consts.C)
+    )
+
+
 def functions(arguments: np.array, consts: Variables) -> np.array:
+    return np.array(_residuals(*arguments, _constants(consts)))
+
+
+def jacobian(arguments: np.array, consts: Variables) -> np.array:
+    """
+    Analytic Jacobian of functions by (x1, x2, y, f1, f2).
+    """
+
     x1, x2, y, f1, f2 = arguments
+    left, right = 3 * np.pi / 2 - f1, 3 * np.pi / 2 + f2
     return np.array(
         [
-            x1 + y * np.cos(3 * np.pi / 2 - f1) - consts.Ax,
-            x2 + y * np.cos(3 * np.pi / 2 + f2) - consts.Bx,
-            y + y * np.sin(3 * np.pi / 2 - f1) - consts.Ay,
-            (f1 + f2) * y + (x2 - x1) - consts.C,
-            y + y * np.sin(3 * np.pi / 2 + f2) - consts.By,
+            [1, 0, np.cos(left), y * np.sin(left), 0],
+            [0, 1, np.cos(right), 0, -y * np.sin(right)],
+            [0, 0, 1 + np.sin(left), -y * np.cos(left), 0],
+            [-1, 1, f1 + f2, y, y],
+            [0, 0, 1 + np.sin(right), 0, y * np.cos(right)],
         ]
     )
 
 
-def make_patch(x: float, angle1: float, angle2: float) -> patches.Arc:
+def newton(
+    arguments: np.array,
+    consts: Variables,
+    data: PhysicProperties,
+    iterations: int = 50,
+) -> Tuple[np.array, int, bool]:
+    """
+    Solves functions(X) = 0 by Newton's method
+    X = X - J(X)^-1 F(X), until all |F| < epsilon.
+    Step is halved (up to BACKTRACKING times) until
+    the residual decreases. It stops as diverged,
+    if residual isn't finite, grows DIVERGENCE times
+    above the initial one or the Jacobian is singular.
+
+    :param arguments: initial X (warm start)
+    :param iterations: maximum amount of steps
+    :return: (X, amount of steps, converged)
+    """
+
+    X_values = np.array(arguments, dtype=float)
+    F_values = functions(X_values, consts)
+    initial = max(np.abs(F_values).max(), data.epsilon)
+
+    for step in range(iterations):
+        residual = np.abs(F_values).max()
+        if residual < data.epsilon:
+            return X_values, step, True
+        if not np.isfinite(residual) or residual > DIVERGENCE * initial:
+            return X_values, step, False
+
+        try:
+            delta = np.linalg.solve(jacobian(X_values, consts), F_values)
+        except np.linalg.LinAlgError:
+            return X_values, step, False
+
+        for scale in 0.5 ** np.arange(BACKTRACKING):
+            candidate = X_values - scale * delta
+            F_candidate = functions(candidate, consts)
+            if np.abs(F_candidate).max() < residual:
+                break
+        X_values, F_values = candidate, F_candidate
+
+    return X_values, iterations, bool(np.abs(F_values).max() < data.epsilon)
+
+
+def relax(
+    arguments: np.array, consts: Variables, data: PhysicProperties
+) -> Tuple[np.array, int]:
+    """
+    Solves functions(X) = 0 by relaxation
+    X = X - tau * F(X), until all |F| < epsilon.
+    Steps are done on floats, not on arrays.
+
+    :return: (X, amount of steps)
+    """
+
+    x1, x2, y, f1, f2 = (float(value) for value in arguments)
+    tau, epsilon, constants = data.tau, data.epsilon, _constants(consts)
+    steps = 0
+
+    while True:
+        steps += 1
+        r1, r2, r3, r4, r5 = _residuals(x1, x2, y, f1, f2, constants)
+        x1, x2, y = x1 - r1 * tau, x2 - r2 * tau, y - r3 * tau
+        f1, f2 = f1 - r4 * tau, f2 - r5 * tau
+
+        if max(abs(r1), abs(r2), abs(r3), abs(r4), abs(r5)) < epsilon:
+            return np.array([x1, x2, y, f1, f2]), steps
+
+
+def frames(timer: Timer) -> int:
+    """
+    Amount of frames from timer.start to timer.end,
+    time is accumulated as in the simulation loop.
+    """
+
+    amount, time = 0, timer.start
+    while time < timer.end:
+        time += timer.step
+        amount += 1
+    return amount
+
+
+def simulate(
+    data: PhysicProperties,
+    timer: Timer,
+    variables: Variables,
+    start_values: Optional[np.array] = None,
+    solver: str = "newton",
+    iterations: int = 50,
+) -> Trajectory:
+    """
+    Runs the physics: every frame the load is moved
+    by its velocity, the shape of the balloon is
+    relaxed to the new position and the velocity
+    is changed by force pressure * length - m * g.
+    Timer and variables aren't changed.
+
+    Newton starts from the shape of the previous frame,
+    if it diverges, the frame is solved by relaxation.
+
+    :param data: physic properties
+    :param timer: time of start, end and step
+    :param variables: initial state of the balloon
+    :param start_values: initial (x1, x2, y, f1, f2), start_x by default
+    :param solver: "newton" or "relaxation"
+    :param iterations: maximum amount of Newton steps per frame
+    :return: Trajectory, arrays are allocated once
+    """
+
+    if solver not in SOLVERS:
+        raise ValueError(f"Solver(={solver}) have to be one of {SOLVERS}!")
+
+    consts = replace(variables)
+    X_values = (
+        np.full(consts.funcs, consts.start_x, dtype=float)
+        if start_values is None
+        else np.array(start_values, dtype=float)
+    )
+
+    size = frames(timer)
+    trajectory = Trajectory(
+        time=np.empty(size),
+        states=np.empty((size, len(X_values))),
+        height=np.empty(size),
+        velocity=np.empty(size),
+        force=np.empty(size),
+        iterations=np.empty(size, dtype=int),
+        relaxations=np.empty(size, dtype=int),
+        elapsed=np.empty(size),
+        converged=np.empty(size, dtype=bool),
+    )
+
+    time = timer.start
+    for frame in range(size):
+        consts.Ay = consts.Ay + consts.Vy * timer.step
+        consts.By = consts.Ay
+
+        started, converged, steps, sweeps = perf_counter(), False, 0, 0
+        if solver == "newton":
+            solution, steps, converged = newton(X_values, consts, data, iterations)
+            if converged:
+                X_values = solution
+        if not converged:
+            X_values, sweeps = relax(X_values, consts, data)
+        elapsed = perf_counter() - started
+
+        consts.length = X_values[1] - X_values[0]
+
+        F = data.pressure * consts.length - data.mass * data.gravity
+        consts.Vy = consts.Vy + (1 / data.mass) * F * timer.step
+        time += timer.step
+
+        trajectory.time[frame] = time
+        trajectory.states[frame] = X_values
+        trajectory.height[frame] = consts.Ay
+        trajectory.velocity[frame] = consts.Vy
+        trajectory.force[frame] = F
+        trajectory.iterations[frame] = steps
+        trajectory.relaxations[frame] = sweeps
+        trajectory.elapsed[frame] = elapsed
+        trajectory.converged[frame] = converged
+
+    return trajectory
+
+
+def make_patch(x: float, radius: float, angle1: float, angle2: float):
     """Creates one part of a balloon."""
+    from matplotlib import patches
+
     return patches.Arc(
-        (x, X_values[2]),
-        X_values[2] * 2,
-        X_values[2] * 2,
+        (x, radius),
+        radius * 2,
+        radius * 2,
         angle=0,
         theta1=angle1,
         theta2=angle2,
@@ -65,6 +299,81 @@ def make_patch(x: float, angle1: float, angle2: float) -> patches.Arc:
     )
 
 
+def render(
+    trajectory: Trajectory,
+    data: PhysicProperties,
+    variables: Variables,
+    path: str = "animation.gif",
+    fps: int = 10,
+) -> None:
+    """
+    Draws every frame of trajectory and saves gif.
+
+    :param trajectory: result of simulate
+    :param data: physic properties of the simulation
+    :param variables: variables of the simulation (Ax, Bx)
+    :param path: file of animation
+    :param fps: frames per second
+    """
+
+    from matplotlib import pyplot
+    from celluloid import Camera
+
+    figure, axis = pyplot.subplots()
+    camera = Camera(figure)
+    size = len(trajectory.time)
+
+    for frame in range(size):
+        X_values = trajectory.states[frame]
+        F, Ay = trajectory.force[frame], trajectory.height[frame]
+
+        e1 = make_patch(X_values[0], X_values[2], 270 - X_values[3] * 180 / np.pi, 270)
+        e2 = make_patch(X_values[1], X_values[2], 270, 270 + X_values[4] * 180 / np.pi)
+
+        axis.add_patch(e1)
+        axis.add_patch(e2)
+
+        figure.suptitle(
+            "Simulation of the movement of a pneumatic balloon",
+            fontsize=14,
+            fontweight="bold",
+        )
+        axis.set_title(
+            f"pressure={data.pressure} Pa, mass={data.mass} kg, gravity={data.gravity} m/s",
+            style="italic",
+        )
+
+        pyplot.text(
+            -0.55, 0.365, "time = %.2f s" % trajectory.time[frame], size="large"
+        )
+
+        pyplot.text(X_values[0] + 0.025, X_values[2] + 0.025, "x1")
+        pyplot.text(X_values[1] + 0.025, X_values[2] + 0.025, "x2")
+        pyplot.plot(X_values[0], X_values[2], "bo")
+        pyplot.plot(X_values[1], X_values[2], "bo")
+
+        direction = 1 if F > 0 else -1
+        pyplot.annotate(
+            "F",
+            xy=(
+                (variables.Ax + variables.Bx) / 2,
+                Ay + abs(F) * 0.000075 * direction + 0.05 * direction,
+            ),
+            xytext=((variables.Ax + variables.Bx) / 2 - 0.01, Ay),
+            arrowprops=dict(facecolor="orange", shrink=0.0005, width=3, headwidth=9),
+        )
+
+        pyplot.xlim([-0.6, 0.6])
+        pyplot.ylim([0, 0.4])
+
+        camera.snap()
+
+        print(f"[LOG]: {frame + 1}/{size} frame was created.")
+
+    animation = camera.animate()
+    animation.save(path, fps=fps)
+
+
 _data = PhysicProperties(pressure=2000, gravity=9.8, mass=100, tau=0.005, epsilon=0.001)
 
 _time = Timer(start=0, end=2.65, step=0.01)
@@ -81,75 +390,63 @@ _vars = Variables(
     Vy=0.5,
 )
 
-X_values = np.array([_vars.start_x for _ in range(_vars.funcs)])
-
-figure, axis = pyplot.subplots()
-camera = Camera(figure)
-
-while _time.start < _time.end:
-    # Makes all arithmetic
-
-    _vars.Ay = _vars.Ay + _vars.Vy * _time.step
-    _vars.By = _vars.Ay
-
-    while ...:
-        F_values = functions(X_values, _vars)
-        X_values = X_values - F_values * _data.tau
-
-        if all([abs(el) < _data.epsilon for el in F_values]):
-            break
-
-    _vars.length = X_values[1] - X_values[0]
-
-    F = _data.pressure * _vars.length - _data.mass * _data.gravity
-    _vars.Vy = _vars.Vy + (1 / _data.mass) * F * _time.step
-
-    _time.start += _time.step
-
-    # Output results in a frame
-
-    e1 = make_patch(X_values[0], 270 - X_values[3] * 180 / np.pi, 270)
-    e2 = make_patch(X_values[1], 270, 270 + X_values[4] * 180 / np.pi)
-
-    axis.add_patch(e1)
-    axis.add_patch(e2)
-
-    figure.suptitle(
-        "Simulation of the movement of a pneumatic balloon",
-        fontsize=14,
-        fontweight="bold",
-    )
-    axis.set_title(
-        f"pressure={_data.pressure} Pa, mass={_data.mass} kg, gravity={_data.gravity} m/s",
-        style="italic",
-    )
-
-    pyplot.text(-0.55, 0.365, "time = %.2f s" % _time.start, size="large")
-
-    pyplot.text(X_values[0] + 0.025, X_values[2] + 0.025, "x1")
-    pyplot.text(X_values[1] + 0.025, X_values[2] + 0.025, "x2")
-    pyplot.plot(X_values[0], X_values[2], "bo")
-    pyplot.plot(X_values[1], X_values[2], "bo")
-
-    direction = 1 if F > 0 else -1
-    pyplot.annotate(
-        "F",
-        xy=(
-            (_vars.Ax + _vars.Bx) / 2,
-            _vars.Ay + abs(F) * 0.000075 * direction + 0.05 * direction,
-        ),
-        xytext=((_vars.Ax + _vars.Bx) / 2 - 0.01, _vars.Ay),
-        arrowprops=dict(facecolor="orange", shrink=0.0005, width=3, headwidth=9),
-    )
-
-    pyplot.xlim([-0.6, 0.6])
-    pyplot.ylim([0, 0.4])
-
-    camera.snap()
-
-    print(
-        f"[LOG]: {int(_time.start // _time.step)}/{int(_time.end // _time.step)} frame was created."
-    )
 
-animation = camera.animate()
-animation.save("animation.gif", fps=10)
+class SimulationTestCase(unittest.TestCase):
+    """
+    Tests for the Jacobian and solvers of the shape.
+    """
+
+    def test_jacobian(self) -> None:
+        """
+        Test of analytic Jacobian against central differences.
+        :return: None
+        """
+
+        h = 1e-6
+        for X_values in ([-0.2, 0.2, 0.3, 1.0, 0.9], [0.5, 0.5, 0.5, 0.5, 0.5]):
+            X_values = np.array(X_values)
+            differences = np.column_stack(
+                [
+                    (
+                        functions(X_values + h * e, _vars)
+                        - functions(X_values - h * e, _vars)
+                    )
+                    / (2 * h)
+                    for e in np.identity(len(X_values))
+                ]
+            )
+            np.testing.assert_allclose(
+                jacobian(X_values, _vars), differences, atol=1e-8
+            )
+
+    def test_solvers(self) -> None:
+        """
+        Test of Newton's method against relaxation on a short
+        timer and of separate counts of a fallback.
+        :return: None
+        """
+
+        data, timer = _data._replace(epsilon=1e-6), Timer(start=0, end=0.1, step=0.01)
+        newtons = simulate(data, timer, _vars)
+        relaxed = simulate(data, timer, _vars, solver="relaxation")
+
+        self.assertTrue(newtons.converged.all())
+        self.assertFalse(newtons.relaxations.any())
+        self.assertFalse(relaxed.converged.any() or relaxed.iterations.any())
+        self.assertTrue((relaxed.relaxations > 0).all())
+        np.testing.assert_allclose(newtons.states, relaxed.states, atol=1e-4)
+        np.testing.assert_allclose(newtons.height, relaxed.height, atol=1e-6)
+        np.testing.assert_allclose(newtons.velocity, relaxed.velocity, atol=1e-4)
+
+        fallback = simulate(data, timer, _vars, iterations=1)
+        self.assertFalse(fallback.converged.all())
+        self.assertTrue((fallback.iterations <= 1).all())
+        np.testing.assert_array_equal(fallback.relaxations > 0, ~fallback.converged)
+        np.testing.assert_allclose(fallback.states, relaxed.states, atol=1e-4)
+
+        with self.assertRaises(ValueError):
+            simulate(data, timer, _vars, solver="euler")
+
+
+if __name__ == "__main__":
+    render(simulate(_data, _time, _vars), _data, _vars)